@@ -0,0 +1,122 @@
+import os
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+# Streaming training data: walk an image directory lazily, decode and augment
+# each image in worker processes and hand back feature matrices chunk by
+# chunk, so datasets (and augmented copies of them) far larger than RAM can
+# be fed to HandClassifier.add_features().
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def walk_dataset(root, classes, extensions=IMAGE_EXTENSIONS):
+    # Yields (image_path, label) for every image under root/<class name>/, sub-directories included
+    for class_name, label in classes.items():
+        class_dir = os.path.join(root, class_name)
+        if not os.path.isdir(class_dir):
+            print(f"Warning: Directory not found: {class_dir}")
+            continue
+        print(f"Found {class_name} images...")
+        for dirpath, dirnames, filenames in os.walk(class_dir):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.lower().endswith(extensions):
+                    yield os.path.join(dirpath, name), label
+
+
+class Augmenter:
+    """Random flip / rotation / brightness / crop for one image.
+
+    Each setting is the largest change applied: rotate in degrees either
+    way, brightness as a fraction (0.25 = 75%..125%), crop as the fraction
+    of each side that may be cut. Works on gray or BGR images.
+    """
+
+    def __init__(self, flip=True, rotate=15.0, brightness=0.25, crop=0.1):
+        self.flip = flip
+        self.rotate = rotate
+        self.brightness = brightness
+        self.crop = crop
+
+    def __call__(self, img, rng):
+        h, w = img.shape[:2]
+        if self.crop:
+            scale = 1 - rng.uniform(0, self.crop)
+            ch, cw = max(1, int(h * scale)), max(1, int(w * scale))
+            y, x = int(rng.integers(h - ch + 1)), int(rng.integers(w - cw + 1))
+            img = img[y:y + ch, x:x + cw]
+            h, w = ch, cw
+        if self.rotate:
+            m = cv2.getRotationMatrix2D((w / 2, h / 2), rng.uniform(-self.rotate, self.rotate), 1.0)
+            img = cv2.warpAffine(img, m, (w, h), borderMode=cv2.BORDER_REFLECT)
+        if self.flip and rng.random() < 0.5:
+            img = cv2.flip(img, 1)
+        if self.brightness:
+            img = cv2.convertScaleAbs(img, alpha=1 + rng.uniform(-self.brightness, self.brightness))
+        return img
+
+
+def _process_chunk(task):
+    # Runs in a worker process: decode, augment and extract one chunk of images.
+    # The RNG is seeded per chunk, so results do not depend on which worker ran it.
+    index, items, pipeline, augmenter, copies, seed = task
+    rng = np.random.default_rng([seed, index])
+    features = np.empty((len(items) * (1 + copies), pipeline.raw_dim), dtype=np.float32)
+    labels = np.empty(len(features), dtype=np.int32)
+    n = read = 0
+    for path, label in items:
+        # Features are gray, so decode straight to gray (skips the colour conversion)
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            continue
+        read += 1
+        for i in range(1 + copies):
+            features[n] = pipeline.extract(img if i == 0 else augmenter(img, rng))
+            labels[n] = label
+            n += 1
+    return features[:n], labels[:n], read
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_features(items, pipeline, augmenter=None, copies=0, workers=None, chunk_size=64, max_pending=None,
+                    seed=0):
+    """Yield (features, labels, images_read) per chunk of (image_path, label) pairs, in order.
+
+    Every image gives its own features plus `copies` augmented ones. items
+    may be any iterable (e.g. walk_dataset()) and is read lazily; at most
+    max_pending chunks (default two per worker) are queued or in flight, so
+    memory stays bounded however large the dataset.
+    """
+    if copies and augmenter is None:
+        augmenter = Augmenter()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = ((i, chunk, pipeline, augmenter, copies, seed) for i, chunk in enumerate(_chunks(items, chunk_size)))
+    if workers <= 1:
+        yield from map(_process_chunk, tasks)
+        return
+
+    # apply_async with a bounded window instead of Pool.imap, which would
+    # read the whole input up front and queue results without limit
+    max_pending = max_pending or 2 * workers
+    with Pool(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(_process_chunk, (task,)))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
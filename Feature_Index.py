@@ -0,0 +1,333 @@
+import numpy as np
+import time
+
+# Nearest-neighbour search backends for HandClassifier. Every index exposes
+# fit(features, labels), add(features, labels), set_row(row, features, label)
+# and search(queries, k), which returns (indices, squared distances) of the k
+# nearest stored rows per query.
+#
+# Rows are float32, or 1-byte integer codes from a quantizing FeaturePipeline
+# (uint8 / int8), which are stored as-is at a quarter of the memory.
+
+# Integer rows are widened to float32 this many at a time (512 KB for
+# 1024-dim rows, so the block stays in cache while BLAS reads it)
+DOT_BLOCK = 128
+
+
+def as_rows(features):
+    # Integer codes keep their dtype; everything else becomes float32
+    arr = np.asarray(features)
+    if arr.dtype.kind in "ui":
+        return arr
+    return arr.astype(np.float32, copy=False)
+
+
+def row_norms(data):
+    # Squared norms; exact (int64, held as float64) for integer rows
+    if data.dtype.kind in "ui":
+        return np.einsum("ij,ij->i", data, data, dtype=np.int64).astype(np.float64)
+    return np.einsum("ij,ij->i", data, data)
+
+
+def _dot(q, data):
+    # q @ data.T; integer rows are widened to float32 a block at a time, so
+    # the product runs in BLAS without a full-size float copy of the data
+    if data.dtype.kind not in "ui":
+        return q @ data.T
+    out = np.empty((len(q), len(data)), dtype=np.float32)
+    buf = np.empty((min(DOT_BLOCK, len(data)), data.shape[1]), dtype=np.float32)
+    for start in range(0, len(data), DOT_BLOCK):
+        rows = data[start:start + DOT_BLOCK]
+        block = buf[:len(rows)]
+        np.copyto(block, rows)
+        out[:, start:start + len(rows)] = q @ block.T
+    return out
+
+
+def _sq_distances(data, data_norms, queries):
+    # ||a - b||^2 = ||a||^2 - 2 a.b + ||b||^2, one BLAS call for all pairs
+    q = np.asarray(queries, dtype=np.float32)
+    d = data_norms[None, :] - 2.0 * _dot(q, data) + np.einsum("ij,ij->i", q, q)[:, None]
+    np.maximum(d, 0, out=d)
+    return d
+
+
+def _top_k(dists, k):
+    k = min(k, dists.shape[1])
+    idx = np.argpartition(dists, k - 1, axis=1)[:, :k]
+    part = np.take_along_axis(dists, idx, axis=1)
+    order = np.argsort(part, axis=1)
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+class _RowBuffer:
+    """Stored rows, labels and squared norms with spare capacity at the end.
+
+    add() writes into the spare rows and doubles the capacity when it runs
+    out, so growing an index one sample at a time is O(1) amortized.
+    set_row() overwrites a row in place (used when a sample is evicted).
+    """
+
+    def _reset(self, features, labels):
+        # float32 or code input (including a read-only memmap) is used without copying
+        self._data = as_rows(features)
+        self._labels = np.asarray(labels, dtype=np.int32)
+        self._norms = row_norms(self._data)
+        self.size = len(self._labels)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def data(self):
+        return self._data[:self.size]
+
+    @property
+    def labels(self):
+        return self._labels[:self.size]
+
+    @property
+    def norms(self):
+        return self._norms[:self.size]
+
+    def nbytes(self):
+        # Memory held by rows, labels and norms (allocated capacity)
+        return self._data.nbytes + self._labels.nbytes + self._norms.nbytes
+
+    def _append(self, features, labels):
+        n = len(features)
+        if self.size + n > len(self._data) or not self._data.flags.writeable:
+            capacity = max(self.size + n, 2 * len(self._data), 16)
+            data = np.empty((capacity, features.shape[1]), dtype=self._data.dtype)
+            new_labels = np.empty(capacity, dtype=np.int32)
+            norms = np.empty(capacity, dtype=self._norms.dtype)
+            data[:self.size] = self.data
+            new_labels[:self.size] = self.labels
+            norms[:self.size] = self.norms
+            self._data, self._labels, self._norms = data, new_labels, norms
+        start = self.size
+        self._data[start:start + n] = features
+        self._labels[start:start + n] = labels
+        self._norms[start:start + n] = row_norms(as_rows(features))
+        self.size += n
+        return start
+
+    def _set(self, row, vector, label):
+        if not self._data.flags.writeable:
+            self._data, self._labels, self._norms = self.data.copy(), self.labels.copy(), self.norms.copy()
+        self._data[row] = vector
+        self._labels[row] = label
+        self._norms[row] = row_norms(self._data[row:row + 1])[0]
+
+
+class BruteForceIndex(_RowBuffer):
+    """Exact search over all stored rows."""
+
+    name = "brute"
+
+    def __init__(self):
+        self._reset(np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.int32))
+
+    def fit(self, features, labels):
+        self._reset(features, labels)
+        return self
+
+    def add(self, features, labels):
+        features = np.atleast_2d(as_rows(features))
+        if len(self):
+            self._append(features, np.atleast_1d(labels))
+        else:
+            self.fit(features.copy(), np.atleast_1d(labels))
+
+    def set_row(self, row, features, label):
+        self._set(row, as_rows(features).reshape(-1), label)
+
+    def search(self, queries, k=3):
+        dists = _sq_distances(self.data, self.norms, np.atleast_2d(queries))
+        return _top_k(dists, k)
+
+
+class PCAIndex(BruteForceIndex):
+    """Exact search in a PCA-reduced space (approximate w.r.t. the raw features)."""
+
+    name = "pca"
+
+    def __init__(self, n_components=32, fit_samples=5000):
+        super().__init__()
+        self.n_components = n_components
+        self.fit_samples = fit_samples
+        self.mean = None
+        self.components = None
+
+    def project(self, features):
+        x = np.atleast_2d(np.asarray(features, dtype=np.float32))
+        return (x - self.mean) @ self.components.T
+
+    def fit(self, features, labels):
+        x = np.asarray(features, dtype=np.float32)
+        # Fit the projection on a subsample; it only needs the dominant directions
+        sample = x
+        if len(x) > self.fit_samples:
+            rng = np.random.default_rng(0)
+            sample = x[np.sort(rng.choice(len(x), self.fit_samples, replace=False))]
+        self.mean = sample.mean(axis=0)
+        _, _, vt = np.linalg.svd(sample - self.mean, full_matrices=False)
+        self.components = np.ascontiguousarray(vt[:self.n_components], dtype=np.float32)
+        return super().fit(self.project(x), labels)
+
+    def add(self, features, labels):
+        if self.components is None:
+            self.fit(features, labels)
+        else:
+            super().add(self.project(features), labels)
+
+    def set_row(self, row, features, label):
+        super().set_row(row, self.project(features)[0], label)
+
+    def search(self, queries, k=3):
+        return super().search(self.project(queries), k)
+
+
+class IVFIndex(_RowBuffer):
+    """Inverted-file index: k-means coarse cells, only n_probe cells are scanned."""
+
+    name = "ivf"
+
+    def __init__(self, n_lists=None, n_probe=4, iterations=10):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.iterations = iterations
+        self.centroids = None
+        self.lists = []
+        self._reset(np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.int32))
+
+    def _assign(self, x):
+        c_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        return np.argmin(_sq_distances(self.centroids, c_norms, x), axis=1)
+
+    def fit(self, features, labels):
+        self._reset(np.ascontiguousarray(as_rows(features)), labels)
+        n = len(self.data)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+
+        rng = np.random.default_rng(0)
+        self.centroids = self.data[rng.choice(n, n_lists, replace=False)].astype(np.float32)
+        for _ in range(self.iterations):
+            assign = self._assign(self.data)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assign, self.data)
+            counts = np.bincount(assign, minlength=n_lists)
+            filled = counts > 0
+            self.centroids[filled] = sums[filled] / counts[filled, None]
+
+        assign = self._assign(self.data)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        # Plain lists so new rows are appended to their cell in O(1)
+        self.lists = [order[bounds[i]:bounds[i + 1]].tolist() for i in range(n_lists)]
+        return self
+
+    def add(self, features, labels):
+        features = np.atleast_2d(as_rows(features))
+        if self.centroids is None:
+            self.fit(features, labels)
+            return
+        # New rows join their nearest existing cell; centroids are not refit
+        start = self._append(features, np.atleast_1d(labels))
+        for offset, cell in enumerate(self._assign(features)):
+            self.lists[cell].append(start + offset)
+
+    def set_row(self, row, features, label):
+        vector = as_rows(features).reshape(1, -1)
+        self.lists[self._assign(self.data[row:row + 1])[0]].remove(row)
+        self._set(row, vector[0], label)
+        self.lists[self._assign(vector)[0]].append(row)
+
+    def search(self, queries, k=3):
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        c_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        cell_d = _sq_distances(self.centroids, c_norms, queries)
+        n_probe = min(self.n_probe, len(self.centroids))
+        probes = np.argpartition(cell_d, n_probe - 1, axis=1)[:, :n_probe]
+
+        all_idx = np.zeros((len(queries), k), dtype=np.int64)
+        all_d = np.full((len(queries), k), np.inf, dtype=np.float32)
+        for qi, cells in enumerate(probes):
+            cand = np.array([i for c in cells for i in self.lists[c]], dtype=np.int64)
+            if len(cand) == 0:
+                continue
+            d = _sq_distances(self.data[cand], self.norms[cand], queries[qi:qi + 1])
+            idx, dist = _top_k(d, k)
+            all_idx[qi, :idx.shape[1]] = cand[idx[0]]
+            all_d[qi, :dist.shape[1]] = dist[0]
+        return all_idx, all_d
+
+
+INDEX_TYPES = {
+    "brute": BruteForceIndex,
+    "pca": PCAIndex,
+    "ivf": IVFIndex,
+}
+
+
+def make_index(kind="brute", **options):
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{kind}', choose from {sorted(INDEX_TYPES)}")
+    return INDEX_TYPES[kind](**options)
+
+
+def vote(labels, dists):
+    # Majority vote per row of neighbour labels; ties go to the closest neighbour
+    out = np.empty(len(labels), dtype=np.int32)
+    for i, (row, drow) in enumerate(zip(labels, dists)):
+        row = row[np.isfinite(drow)]
+        if len(row) == 0:
+            out[i] = 0
+            continue
+        values, counts = np.unique(row, return_counts=True)
+        best = values[counts == counts.max()]
+        out[i] = row[0] if row[0] in best else best[0]
+    return out
+
+
+def evaluate_index(index, features, queries, k=3):
+    """Recall@k against exact search plus per-query latency for an index.
+
+    The index must already be fitted on features.
+    """
+    exact = BruteForceIndex().fit(features, np.zeros(len(features), dtype=np.int32))
+    truth, _ = exact.search(queries, k)
+    found = np.empty_like(truth)
+    times = []
+    for i, q in enumerate(np.atleast_2d(queries)):
+        t0 = time.perf_counter()
+        idx, _ = index.search(q, k)
+        times.append(time.perf_counter() - t0)
+        found[i] = idx[0]
+    hits = sum(len(set(a) & set(b)) for a, b in zip(truth, found))
+    times = np.array(times) * 1000
+    return {
+        "index": index.name,
+        "samples": len(features),
+        "recall": hits / truth.size,
+        "latency_ms_mean": float(times.mean()),
+        "latency_ms_p50": float(np.percentile(times, 50)),
+        "latency_ms_p99": float(np.percentile(times, 99)),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import Model_Format
+
+    # Usage: python Feature_Index.py [model.rpsm] – recall/latency per backend
+    path = sys.argv[1] if len(sys.argv) > 1 else "model.rpsm"
+    arrays, _ = Model_Format.load_arrays(path)
+    features, labels = np.asarray(arrays["features"]), np.asarray(arrays["labels"])
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(features), min(200, len(features)), replace=False)
+    queries = features[picks] + rng.normal(0, 2, (len(picks), features.shape[1])).astype(np.float32)
+    for kind in INDEX_TYPES:
+        index = make_index(kind).fit(features, labels)
+        print(evaluate_index(index, features, queries))
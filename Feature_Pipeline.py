@@ -0,0 +1,147 @@
+import cv2
+import numpy as np
+
+# HOG layout for the small classifier images: 16x16 blocks of 8x8 cells
+HOG_BLOCK = (16, 16)
+HOG_STRIDE = (8, 8)
+HOG_CELL = (8, 8)
+HOG_BINS = 9
+
+
+class FeaturePipeline:
+    """Turns a BGR (or grayscale) hand image into a feature vector.
+
+    Stages: grayscale -> resize -> optional histogram equalization (lighting
+    normalization) -> raw pixels or HOG -> optional PCA projection -> optional
+    quantization. The PCA projection is fitted on the training features and
+    saved with the model.
+
+    With quantize=True, encode() returns 1-byte codes instead of float32:
+    uint8 for pixels (lossless, they are 0..255 already) and HOG (values
+    are at most 1), int8 after PCA, with a scale calibrated when PCA is
+    fitted. One scale is shared by every dimension, so squared distances
+    between codes are the float distances times scale**2 and neighbours
+    rank the same.
+    """
+
+    def __init__(self, img_size=(32, 32), normalize=False, hog=False, pca_components=None, quantize=False):
+        self.img_size = tuple(img_size)
+        self.normalize = normalize
+        self.hog = hog
+        self.pca_components = pca_components
+        self.pca_mean = None
+        self.pca_matrix = None
+        self.quantize = quantize
+        self.code_scale = None  # feature units per code step
+        self._hog = None
+
+    def __getstate__(self):
+        # cv2.HOGDescriptor cannot be pickled; rebuild it in worker processes
+        state = self.__dict__.copy()
+        state["_hog"] = None
+        return state
+
+    @property
+    def fitted(self):
+        return self.pca_matrix is not None
+
+    @property
+    def raw_dim(self):
+        if self.hog:
+            w, h = self.img_size
+            blocks = ((w - HOG_BLOCK[0]) // HOG_STRIDE[0] + 1) * ((h - HOG_BLOCK[1]) // HOG_STRIDE[1] + 1)
+            cells = (HOG_BLOCK[0] // HOG_CELL[0]) * (HOG_BLOCK[1] // HOG_CELL[1])
+            return blocks * cells * HOG_BINS
+        return self.img_size[0] * self.img_size[1]
+
+    @property
+    def code_dtype(self):
+        # Dtype of encoded features; None = float32 (not quantized, or PCA not fitted yet)
+        if not self.quantize or (self.pca_components and not self.fitted):
+            return None
+        return np.int8 if self.fitted else np.uint8
+
+    @property
+    def dim(self):
+        return len(self.pca_matrix) if self.fitted else self.raw_dim
+
+    def extract(self, img):
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        resized = cv2.resize(gray, self.img_size)
+        if self.normalize:
+            resized = cv2.equalizeHist(resized)
+        if self.hog:
+            if self._hog is None:
+                self._hog = cv2.HOGDescriptor(self.img_size, HOG_BLOCK, HOG_STRIDE, HOG_CELL, HOG_BINS)
+            return self._hog.compute(resized).reshape(-1).astype(np.float32)
+        return resized.reshape(-1).astype(np.float32)
+
+    def fit(self, features):
+        # Fit the PCA projection (no-op when PCA is not configured)
+        if not self.pca_components:
+            return
+        x = np.asarray(features, dtype=np.float32)
+        self.pca_mean = x.mean(axis=0)
+        _, _, vt = np.linalg.svd(x - self.pca_mean, full_matrices=False)
+        self.pca_matrix = np.ascontiguousarray(vt[:self.pca_components], dtype=np.float32)
+        if self.quantize:
+            self.calibrate(self.project(x))
+
+    def calibrate(self, features):
+        # int8 scale for projected features: the largest value maps to 127
+        peak = float(np.abs(features).max()) if len(features) else 0.0
+        self.code_scale = peak / 127 if peak > 0 else 1.0
+
+    def quantize_features(self, features):
+        # Projected features -> codes (unchanged when not quantizing)
+        dtype = self.code_dtype
+        if dtype is None:
+            return features
+        scale = self.code_scale or (1 / 255 if self.hog else 1.0)
+        info = np.iinfo(dtype)
+        codes = np.rint(np.asarray(features, dtype=np.float32) / scale)
+        return np.clip(codes, info.min, info.max).astype(dtype)
+
+    def project(self, features):
+        if not self.fitted:
+            return features
+        x = np.asarray(features, dtype=np.float32)
+        return (x - self.pca_mean) @ self.pca_matrix.T
+
+    def encode(self, features):
+        # Raw features (from extract) -> what the classifier stores and searches
+        return self.quantize_features(self.project(features))
+
+    def transform(self, img):
+        return self.encode(self.extract(img))
+
+    def to_meta(self):
+        return {
+            "img_size": list(self.img_size),
+            "normalize": self.normalize,
+            "hog": self.hog,
+            "pca_components": self.pca_components,
+            "quantize": self.quantize,
+            "code_scale": self.code_scale,
+        }
+
+    def arrays(self):
+        if not self.fitted:
+            return {}
+        return {"pca_mean": self.pca_mean, "pca_matrix": self.pca_matrix}
+
+    @classmethod
+    def from_meta(cls, meta, arrays=None):
+        pipeline = cls(
+            img_size=meta.get("img_size", (32, 32)),
+            normalize=meta.get("normalize", False),
+            hog=meta.get("hog", False),
+            pca_components=meta.get("pca_components"),
+            quantize=meta.get("quantize", False),
+        )
+        pipeline.code_scale = meta.get("code_scale")
+        if arrays and "pca_matrix" in arrays:
+            # Copied: small, and a live memmap would block saving over the model file
+            pipeline.pca_mean = np.array(arrays["pca_mean"], dtype=np.float32)
+            pipeline.pca_matrix = np.array(arrays["pca_matrix"], dtype=np.float32)
+        return pipeline
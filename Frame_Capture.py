@@ -0,0 +1,213 @@
+import cv2
+import os
+import threading
+import time
+from collections import deque
+
+
+class CaptureSource:
+    """A camera index or a video file behind the cv2.VideoCapture read API."""
+
+    def __init__(self, source=0, width=640, height=480, backend=None, loop=False):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.backend = backend
+        self.loop = loop
+        self.is_file = isinstance(source, str)
+        self.cap = None
+
+    def open(self):
+        if self.is_file:
+            self.cap = cv2.VideoCapture(self.source)
+        elif self.backend is not None:
+            self.cap = cv2.VideoCapture(self.source, self.backend)
+        else:
+            self.cap = cv2.VideoCapture(self.source)
+        if not self.is_file and self.cap.isOpened():
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return self.cap.isOpened()
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self):
+        if self.cap is None:
+            return False, None
+        ret, frame = self.cap.read()
+        if (not ret or frame is None) and self.is_file and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    @property
+    def fps(self):
+        if self.cap is None:
+            return 0.0
+        return self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageSequenceSource:
+    """A directory of still images read in name order, one per frame."""
+
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, directory, fps=30.0, loop=False):
+        self.source = directory
+        self.is_file = True
+        self.loop = loop
+        self.fps = fps
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(self.EXTENSIONS)
+        )
+        self.pos = 0
+
+    def open(self):
+        return bool(self.paths)
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def read(self):
+        if self.pos >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self.pos = 0
+        frame = cv2.imread(self.paths[self.pos])
+        self.pos += 1
+        return frame is not None, frame
+
+    def release(self):
+        pass
+
+
+def find_camera(max_index=3, width=640, height=480):
+    # Probe the first few camera indices (DSHOW is the robust backend on Windows)
+    for i in range(max_index):
+        print(f"[RPS] Testing camera {i}...")
+        source = CaptureSource(i, width, height, backend=cv2.CAP_DSHOW)
+        if source.open():
+            ret, frame = source.read()
+            if ret and frame is not None and frame.size > 0:
+                print(f"[RPS] Found working camera at index {i}")
+                return source
+        source.release()
+    print("[RPS] Fallback: trying index 0 without DSHOW")
+    source = CaptureSource(0, width, height)
+    source.open()
+    return source
+
+
+def open_source(video_path=None, width=640, height=480, loop=False):
+    # A video file or image directory is used as-is (handy for testing),
+    # otherwise probe for a camera
+    if video_path and os.path.isdir(video_path):
+        return ImageSequenceSource(video_path, loop=loop)
+    if video_path:
+        if not os.path.exists(video_path):
+            print(f"[RPS] Warning: video file not found: {video_path}")
+        source = CaptureSource(video_path, width, height, loop=loop)
+        source.open()
+        return source
+    return find_camera(width=width, height=height)
+
+
+class ThreadedCapture:
+    """Grabs frames on a background thread into a small ring buffer.
+
+    read() always hands back the newest frame (latest-frame-wins); frames that
+    were overwritten or skipped before the consumer got to them are counted in
+    frames_dropped. With drop_frames=False the grabber waits for the consumer
+    instead, which keeps video-file playback deterministic.
+    """
+
+    def __init__(self, source, buffer_size=2, drop_frames=True):
+        self.source = source
+        self.buffer = deque(maxlen=buffer_size)
+        self.drop_frames = drop_frames
+        self.cond = threading.Condition()
+        self.running = False
+        self.finished = False
+        self.thread = None
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self.last_latency = 0.0
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.finished = False
+        self.thread = threading.Thread(target=self._run, name="FrameCapture", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while self.running:
+            ret, frame = self.source.read()
+            if not ret or frame is None:
+                self.read_failures += 1
+                if self.source.is_file and not self.source.loop:
+                    break
+                time.sleep(0.01)
+                continue
+            stamp = time.perf_counter()
+            with self.cond:
+                if not self.drop_frames:
+                    while self.running and len(self.buffer) == self.buffer.maxlen:
+                        self.cond.wait(0.1)
+                elif len(self.buffer) == self.buffer.maxlen:
+                    self.frames_dropped += 1
+                self.buffer.append((stamp, frame))
+                self.frames_captured += 1
+                self.cond.notify_all()
+        with self.cond:
+            self.finished = True
+            self.cond.notify_all()
+
+    def read(self, timeout=1.0):
+        with self.cond:
+            if not self.buffer and not self.finished:
+                self.cond.wait(timeout)
+            if not self.buffer:
+                return False, None
+            if self.drop_frames:
+                stamp, frame = self.buffer.pop()
+                self.frames_dropped += len(self.buffer)
+                self.buffer.clear()
+            else:
+                stamp, frame = self.buffer.popleft()
+            self.frames_delivered += 1
+            self.last_latency = time.perf_counter() - stamp
+            self.cond.notify_all()
+            return True, frame
+
+    def isOpened(self):
+        return self.source.isOpened() and not (self.finished and not self.buffer)
+
+    def stats(self):
+        return {
+            "captured": self.frames_captured,
+            "delivered": self.frames_delivered,
+            "dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+            "latency_ms": round(self.last_latency * 1000, 2),
+        }
+
+    def release(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.source.release()
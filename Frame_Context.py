@@ -0,0 +1,124 @@
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    """Everything derived from one camera frame, each computed at most once.
+
+    begin() flips the raw frame into a clean buffer and copies it to the
+    canvas that the game draws on. Derived images (RGB for MediaPipe, gray,
+    the gray ROI, downscaled gray and RGB frames) are computed from the clean
+    frame on first access and cached until the next begin(). All outputs go
+    into buffers that are allocated once and reused for every frame, and
+    stats() counts conversions and allocations so the savings can be checked.
+    """
+
+    def __init__(self, flip=True, small_size=(160, 120)):
+        self.flip = flip
+        self.small_size = small_size
+        self.buffers = {}
+        self.cache = {}
+        self.frame = None
+        self.canvas = None
+        self.roi_rect = None
+        self.frames = 0
+        self.allocations = 0
+        self.conversions = {}
+
+    def _buffer(self, name, shape):
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self.buffers[name] = buf
+            self.allocations += 1
+        return buf
+
+    def _count(self, name):
+        self.conversions[name] = self.conversions.get(name, 0) + 1
+
+    def begin(self, raw, flip=None):
+        # Returns the canvas to draw on; the clean frame stays in self.frame
+        flip = self.flip if flip is None else flip
+        self.frame = self._buffer("frame", raw.shape)
+        if flip:
+            cv2.flip(raw, 1, dst=self.frame)
+            self._count("flip")
+        else:
+            np.copyto(self.frame, raw)
+        self.canvas = self._buffer("canvas", raw.shape)
+        np.copyto(self.canvas, self.frame)
+        self.cache = {}
+        self.frames += 1
+        return self.canvas
+
+    def set_roi(self, x, y, size):
+        # The ROI may move between frames (see Roi_Tracker), so drop a stale crop
+        if (x, y, size) != self.roi_rect:
+            self.roi_rect = (x, y, size)
+            self.cache.pop("roi_gray", None)
+
+    def _derived(self, name, make):
+        if name not in self.cache:
+            self.cache[name] = make()
+            self._count(name)
+        return self.cache[name]
+
+    @property
+    def rgb(self):
+        def make():
+            out = self._buffer("rgb", self.frame.shape)
+            return cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB, dst=out)
+        return self._derived("rgb", make)
+
+    @property
+    def gray(self):
+        def make():
+            out = self._buffer("gray", self.frame.shape[:2])
+            return cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY, dst=out)
+        return self._derived("gray", make)
+
+    @property
+    def roi(self):
+        # Clean (undrawn) BGR view of the ROI – no copy
+        x, y, size = self.roi_rect
+        return self.frame[y:y + size, x:x + size]
+
+    @property
+    def roi_gray(self):
+        def make():
+            x, y, size = self.roi_rect
+            if "gray" in self.cache:
+                return self.cache["gray"][y:y + size, x:x + size]
+            out = self._buffer("roi_gray", (size, size))
+            return cv2.cvtColor(self.roi, cv2.COLOR_BGR2GRAY, dst=out)
+        return self._derived("roi_gray", make)
+
+    @property
+    def small(self):
+        # Downscaled gray frame, e.g. for cheap change detection
+        def make():
+            w, h = self.small_size
+            out = self._buffer("small", (h, w))
+            return cv2.resize(self.gray, self.small_size, dst=out, interpolation=cv2.INTER_AREA)
+        return self._derived("small", make)
+
+    def rgb_scaled(self, scale):
+        # RGB frame downscaled by scale, e.g. for running a detector on fewer
+        # pixels; resized before the colour conversion, so both stay small
+        if scale >= 1:
+            return self.rgb
+        def make():
+            h, w = self.frame.shape[:2]
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            bgr = self._buffer("bgr_scaled", (size[1], size[0], 3))
+            cv2.resize(self.frame, size, dst=bgr, interpolation=cv2.INTER_AREA)
+            return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb_scaled", bgr.shape))
+        return self._derived(f"rgb_x{scale:g}", make)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "allocations": self.allocations,
+            "conversions": dict(self.conversions),
+            "conversions_per_frame": round(sum(self.conversions.values()) / self.frames, 2) if self.frames else 0.0,
+        }
@@ -0,0 +1,117 @@
+import cv2
+import os
+import time
+
+# Named keys accepted in key scripts (anything else must be a single character)
+KEY_NAMES = {"space": ord(" "), "esc": 27, "enter": 13}
+NO_KEY = 255
+
+
+def parse_key(name):
+    name = name.strip()
+    if name.lower() in KEY_NAMES:
+        return KEY_NAMES[name.lower()]
+    if len(name) == 1:
+        return ord(name)
+    raise ValueError(f"Unknown key '{name}'")
+
+
+def load_key_script(spec):
+    """Scripted keypresses as {frame_index: key_code}.
+
+    spec is either inline ("30:r,90:space") or a file with one
+    "<frame> <key>" pair per line ('#' starts a comment). Keys scheduled
+    on the same frame are pushed to the following frames, as a real
+    keyboard delivers one key per waitKey call.
+    """
+    if not spec:
+        return {}
+    if os.path.exists(spec):
+        with open(spec) as f:
+            entries = [line.split("#")[0].split() for line in f]
+        entries = [e for e in entries if e]
+    else:
+        entries = [part.split(":") for part in spec.split(",") if part.strip()]
+    keys = {}
+    for frame, name in entries:
+        frame = int(frame)
+        while frame in keys:
+            frame += 1
+        keys[frame] = parse_key(name)
+    return keys
+
+
+class GuiDisplay:
+    """The normal OpenCV window."""
+
+    headless = False
+
+    def __init__(self, window="Image"):
+        self.window = window
+        cv2.namedWindow(window, cv2.WINDOW_NORMAL)
+
+    def show(self, img):
+        cv2.imshow(self.window, img)
+
+    def poll_key(self, delay=1):
+        return cv2.waitKey(delay) & 0xFF
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class HeadlessDisplay:
+    """No windows: keys come from a script, frames are optionally written to a video."""
+
+    headless = True
+
+    def __init__(self, keys=None, record_path=None, fps=30.0):
+        self.keys = keys or {}
+        self.record_path = record_path
+        self.fps = fps
+        self.writer = None
+        self.frame_index = -1
+        self.frames_shown = 0
+
+    def show(self, img):
+        self.frames_shown += 1
+        if self.record_path:
+            if self.writer is None:
+                h, w = img.shape[:2]
+                fourcc = cv2.VideoWriter_fourcc(*"MJPG")
+                self.writer = cv2.VideoWriter(self.record_path, fourcc, self.fps, (w, h))
+            self.writer.write(img)
+
+    def poll_key(self, delay=1):
+        # Called once per frame, so the call count is the frame index
+        self.frame_index += 1
+        return self.keys.get(self.frame_index, NO_KEY)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class FrameClock:
+    """Game time derived from the number of frames seen, for deterministic replays."""
+
+    def __init__(self, fps=30.0):
+        self.fps = fps or 30.0
+        self.frames = 0
+
+    def tick(self):
+        self.frames += 1
+
+    def __call__(self):
+        return self.frames / self.fps
+
+
+class WallClock:
+    """Real time, for live play."""
+
+    def tick(self):
+        pass
+
+    def __call__(self):
+        return time.time()
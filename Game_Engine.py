@@ -0,0 +1,622 @@
+import cv2
+import os
+import threading
+import time
+
+import numpy as np
+
+import Frame_Context
+import Game_Display
+import Hud_Compositor
+import Opponent_Engine
+import Perf_Profiler
+import Prediction_Scheduler
+import RPSGame
+import Score_Store
+import Speech_Worker
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# State machine constants
+STATE_WAITING = 0
+STATE_COUNTDOWN = 1
+STATE_RESULT = 2
+STATE_TRAINING = 3
+STATE_PAUSED = 4
+# States in which the ROI is read, so a RoiTracker only has to follow the hand in these
+ROI_STATES = (STATE_WAITING, STATE_COUNTDOWN, STATE_TRAINING)
+
+IDLE_STATUS = "Press 'T' to Train or R/P/S to Play"
+GESTURE_NAMES = ["", "Rock", "Paper", "Scissor"]
+
+# Game configuration
+DIFFICULTIES = ["easy", "medium", "hard"]
+# Opponent_Engine strategy behind each difficulty
+DIFFICULTY_STRATEGIES = {"easy": "random", "medium": "frequency", "hard": "mixture"}
+THEMES = {
+    "dark": {
+        "bg": (30, 30, 30),
+        "roi": (0, 255, 0),
+        "text": (255, 255, 255),
+        "win": (0, 255, 0),
+        "lose": (0, 0, 255),
+        "draw": (255, 255, 0),
+    },
+    "light": {
+        "bg": (220, 220, 220),
+        "roi": (0, 150, 0),
+        "text": (0, 0, 0),
+        "win": (0, 150, 0),
+        "lose": (150, 0, 0),
+        "draw": (150, 150, 0),
+    },
+}
+
+HELP_LINES = [
+    "Controls:",
+    "  T – toggle Training Mode",
+    "  1/2/3 – add samples (Training)",
+    "  SPACE – train model / lock move",
+    "  R/P/S – manual play",
+    "  D – change difficulty",
+    "  C – toggle theme",
+    "  H – show this help",
+    "  P – pause/resume",
+    "  F – performance overlay",
+    "  Q – quit",
+]
+
+
+def img_path(name):
+    return os.path.join(BASE_DIR, "images", name)
+
+
+# ----------------------------------------------------------------------
+# Audio
+# ----------------------------------------------------------------------
+class AudioBackend:
+    """Background music, click / win / lose / draw sounds and voice cues.
+
+    pygame is imported and its mixer started on the first start() call, so
+    constructing the backend (or running with enabled=False) costs nothing.
+    start(background=True) does that on a helper thread so the first camera
+    frame does not wait for the audio device; cues before then are skipped.
+    """
+
+    def __init__(self, enabled=True, base_dir=BASE_DIR):
+        self.enabled = enabled
+        self.base_dir = base_dir
+        self.sounds = {}
+        self.started = False
+        # Voice cues run on a background worker so they never block the video loop;
+        # sound cues play straight away (Sound.play() does not block)
+        self.speech = Speech_Worker.SpeechWorker(enabled=enabled)
+
+    def start(self, background=False):
+        if self.started or not self.enabled:
+            return
+        self.started = True
+        if background:
+            threading.Thread(target=self._start, name="AudioStart", daemon=True).start()
+        else:
+            self._start()
+
+    def _start(self):
+        try:
+            import pygame
+            pygame.mixer.init()
+        except Exception as e:
+            print("[RPS] Warning: pygame audio not available:", e)
+            return
+        # Load background music (if any)
+        try:
+            mpath = os.path.join(self.base_dir, "music", "foo.wav")
+            if os.path.exists(mpath):
+                pygame.mixer.music.load(mpath)
+                pygame.mixer.music.play(-1)
+            else:
+                print("[RPS] Warning: music/foo.wav not found")
+        except Exception as e:
+            print("[RPS] Warning: failed to load music:", e)
+        self.sounds = self.load_sounds(pygame)
+
+    def load_sounds(self, pygame):
+        """Load click / win / lose / draw sounds if they exist."""
+        sounds = {}
+        base = os.path.join(self.base_dir, "sounds")
+        for name in ["click", "win", "lose", "draw"]:
+            path = os.path.join(base, f"{name}.wav")
+            if os.path.exists(path):
+                try:
+                    sounds[name] = pygame.mixer.Sound(path)
+                except Exception:
+                    pass
+        return sounds
+
+    def play(self, key):
+        if key in self.sounds:
+            self.speech.play(self.sounds[key], key=key, window=0.1)
+
+    def say(self, text):
+        self.speech.say(text)
+
+    def cancel(self):
+        self.speech.cancel()
+
+    def close(self):
+        self.speech.close()
+
+
+# ----------------------------------------------------------------------
+# Overlay images
+# ----------------------------------------------------------------------
+def placeholder(txt):
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(img, txt, (80, 260), cv2.FONT_HERSHEY_SIMPLEX, 4, (255, 255, 255), 8)
+    return img
+
+
+def scale_overlay(img, max_w=200, max_h=150):
+    if img is None:
+        return None
+    h, w = img.shape[:2]
+    scale = min(max_w / w, max_h / h, 1.0)
+    new_w, new_h = int(w * scale), int(h * scale)
+    return cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
+
+
+def load_overlays():
+    # Load overlay images (with placeholders if missing)
+    overlays = []
+    for name, text in [("Scissor.jpeg", "SCISSOR"), ("Paper.jpeg", "PAPER"), ("Rock.jpeg", "ROCK")]:
+        img = cv2.imread(img_path(name))
+        overlays.append(scale_overlay(img if img is not None else placeholder(text)))
+    return overlays  # 0:Scissor, 1:Paper, 2:Rock
+
+
+# ----------------------------------------------------------------------
+# Engine
+# ----------------------------------------------------------------------
+class GameEngine:
+    """The camera game as an object: one step() per frame through the state machine.
+
+    Capture, display, clock, classifiers, detector and audio are injected, so
+    the same engine runs live, headless on a recording, or under a benchmark.
+    """
+
+    def __init__(self, capture, display, classifier=None, landmark_classifier=None, detector=None,
+                 audio=None, clock=None, timer=None, score_file=None, width=640, height=480, startup=None,
+                 tracker=None, roi_tracker=None):
+        self.capture = capture
+        self.display = display
+        self.classifier = classifier
+        self.landmark_classifier = landmark_classifier
+        self.detector = detector
+        # --landmarks: classify MediaPipe hand landmarks instead of ROI pixels, so the
+        # hand can be anywhere in the frame (falls back to fingersUp rules until trained)
+        self.use_landmarks = landmark_classifier is not None and detector is not None
+        self.active_classifier = landmark_classifier if self.use_landmarks else classifier
+        # Two players in front of one camera: every hand comes from the same detection
+        # pass, a HandTracker keeps their IDs stable and each ID holds a player slot
+        # (P1 left, P2 right) with its own score
+        self.tracker = tracker
+        self.two_player = self.use_landmarks and tracker is not None
+        self.slots = {}
+        self.hands = []
+        self.match_scores = [0, 0]
+        self.audio = audio or AudioBackend(enabled=False)
+        self.clock = clock or Game_Display.WallClock()
+        self.timer = timer or Perf_Profiler.StageTimer()
+        self.width, self.height = width, height
+        self.show_profile = False
+        self.startup = startup
+
+        # ROI settings; with a roi_tracker (see Roi_Tracker) the ROI follows the
+        # hand and this box is only the starting point and the label anchor
+        self.roi_size = 250
+        self.roi_x = 50
+        self.roi_y = 100
+        self.roi_home = (self.roi_x, self.roi_y, self.roi_size)
+        self.roi_tracker = None if self.use_landmarks else roi_tracker
+        # Per-frame derived images (RGB, gray ROI, thumbnail), each computed once
+        self.frame = Frame_Context.FrameContext()
+        self.frame.set_roi(self.roi_x, self.roi_y, self.roi_size)
+
+        self.difficulty = "easy"
+        self.theme_name = "dark"
+        self.state = STATE_WAITING
+        self.state_start_time = 0
+        self.countdown_duration = 2.0
+        self.result_duration = 1.5
+        self.status_text = IDLE_STATUS
+        self.help_until = 0
+        self.player_choice = 0
+        self.computer_choice = 0
+        self.opponent = Opponent_Engine.Opponent(DIFFICULTY_STRATEGIES[self.difficulty])
+
+        # Rounds are logged and saved on a background thread (see Score_Store)
+        self.scores = Score_Store.ScoreStore(score_file)
+        self.score_data = self.scores.data
+        self.player_score = self.score_data.get("player_score", 0)
+        self.computer_score = self.score_data.get("computer_score", 0)
+        self.overlays = load_overlays()
+        # Text, boxes and overlays are cached as sprites and blended in one pass (see Hud_Compositor)
+        self.hud = Hud_Compositor.HudCompositor(width, height)
+
+        # The live "Detected:" label only re-runs inference when the hand moved (at most
+        # 10x per second) and is smoothed over the last few predictions
+        self.scheduler = Prediction_Scheduler.PredictionScheduler(self.classify)
+        self.handlers = {
+            STATE_TRAINING: self.handle_training,
+            STATE_WAITING: self.handle_waiting,
+            STATE_COUNTDOWN: self.handle_countdown,
+            STATE_RESULT: self.handle_result,
+            STATE_PAUSED: self.handle_paused,
+        }
+        self.running = False
+
+    # -- classification --------------------------------------------------
+    def find_landmarks(self, frame):
+        with self.timer.stage("findHands"):
+            self.detector.findHands(frame, rgb=self.frame.rgb)
+        return self.detector.findPosition(frame, draw=False)
+
+    def find_hands(self, frame):
+        with self.timer.stage("findHands"):
+            self.detector.findHands(frame, rgb=self.frame.rgb)
+            hands = self.tracker.update(self.detector.findAllPositions(frame))
+        self.assign_slots(hands)
+        self.hands = hands
+        return hands
+
+    def assign_slots(self, hands):
+        # A slot stays with its track until the tracker drops it; new tracks take a
+        # free slot, preferring the side of the frame they appeared on
+        self.slots = {tid: slot for tid, slot in self.slots.items() if tid in self.tracker.tracks}
+        for hand in sorted(hands, key=lambda h: h["center"][0]):
+            free = [slot for slot in (0, 1) if slot not in self.slots.values()]
+            if hand["id"] in self.slots or not free:
+                continue
+            side = 0 if hand["center"][0] < self.width / 2 else 1
+            self.slots[hand["id"]] = side if side in free else free[0]
+
+    def classify_players(self, frame):
+        # (P1, P2) gestures, both hands classified in one index query
+        by_slot = {self.slots[h["id"]]: h for h in self.find_hands(frame) if h["id"] in self.slots}
+        present = [slot for slot in (0, 1) if slot in by_slot]
+        lmLists = [by_slot[slot]["lmList"] for slot in present]
+        labels = self.landmark_classifier.predict_many(lmLists, [self.detector.fingersUp(l) for l in lmLists])
+        choices = dict(zip(present, labels))
+        return choices.get(0, 0), choices.get(1, 0)
+
+    def can_classify(self):
+        return self.use_landmarks or (self.classifier is not None and self.classifier.is_trained)
+
+    def classify(self, frame, roi=None):
+        # roi defaults to the gray ROI of the clean frame, converted only when needed
+        with self.timer.stage("predict"):
+            if self.two_player:
+                return self.classify_players(frame)
+            if self.use_landmarks:
+                lmList = self.find_landmarks(frame)
+                return self.landmark_classifier.predict(lmList, self.detector.fingersUp(lmList))
+            return self.classifier.predict(self.frame.roi_gray if roi is None else roi)
+
+    def add_training_sample(self, frame, label):
+        if self.use_landmarks:
+            return self.landmark_classifier.add_sample(self.find_landmarks(frame), label)
+        self.classifier.add_sample(self.frame.roi_gray, label)
+        return True
+
+    # -- state handling ----------------------------------------------------
+    def set_state(self, state, now):
+        self.state = state
+        self.state_start_time = now
+
+    def start_round(self, choice, now, cue):
+        self.player_choice = choice
+        self.set_state(STATE_COUNTDOWN, now)
+        self.audio.say(cue)
+
+    def handle_keys(self, key, now):
+        # Global shortcuts; returns the key left for the state handler
+        if key == ord('p'):
+            if self.state != STATE_PAUSED:
+                self.state = STATE_PAUSED
+                self.status_text = "PAUSED – press 'p' to resume"
+            else:
+                self.state = STATE_WAITING
+                self.status_text = IDLE_STATUS
+            return Game_Display.NO_KEY
+        if key == ord('t') and self.state in (STATE_WAITING, STATE_TRAINING):
+            self.state = STATE_TRAINING if self.state == STATE_WAITING else STATE_WAITING
+            if self.state == STATE_WAITING:
+                self.scheduler.reset()
+            return Game_Display.NO_KEY
+        if key == ord('c'):
+            self.theme_name = "light" if self.theme_name == "dark" else "dark"
+        if key == ord('d'):
+            idx = DIFFICULTIES.index(self.difficulty)
+            self.difficulty = DIFFICULTIES[(idx + 1) % len(DIFFICULTIES)]
+            self.opponent = Opponent_Engine.Opponent(DIFFICULTY_STRATEGIES[self.difficulty])
+            self.status_text = f"Difficulty: {self.difficulty.title()}"
+        if key == ord('h'):
+            self.help_until = now + 5
+        if key == ord('f'):
+            self.show_profile = not self.show_profile
+        return key
+
+    def handle_training(self, img, roi_img, key, now, theme):
+        self.hud.text("title", "TRAINING MODE", (20, 50), cv2.FONT_HERSHEY_COMPLEX, 1, (0, 0, 255), 2)
+        self.hud.text("instructions", ["1:Rock 2:Paper 3:Scissor", "SPACE: Train Model"], (20, 80),
+                      cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 255), 2)
+        counts = [self.active_classifier.sample_count(label) for label in (1, 2, 3)]
+        sample_counts = f"Samples - R:{counts[0]} P:{counts[1]} S:{counts[2]}"
+        self.hud.text("samples", sample_counts, (20, 450), cv2.FONT_HERSHEY_PLAIN, 1.5, (255, 255, 255), 2)
+        if key in (ord('1'), ord('2'), ord('3')):
+            self.add_training_sample(img, key - ord('0'))
+        elif key == ord(' '):
+            if self.active_classifier.train():
+                self.status_text = "Model Trained! Press T to Play"
+                self.audio.play("win")
+        return img
+
+    def handle_waiting(self, img, roi_img, key, now, theme):
+        # Two-player mode has its own title and no ROI box
+        if self.two_player:
+            return self.handle_waiting_two_player(img, key, now, theme)
+        self.hud.text("title", self.status_text, (20, 50), cv2.FONT_HERSHEY_COMPLEX, 0.8, theme["text"], 2)
+        home_x, home_y, home_size = self.roi_home
+        self.hud.text("instructions", "Put hand in box", (home_x, home_y - 10),
+                      cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 255), 2)
+        if self.can_classify():
+            # Landmark mode watches the whole frame, pixel mode only the ROI
+            watch = self.frame.small if self.use_landmarks else self.frame.roi_gray
+            pred = self.scheduler.update(watch, img, now=now)
+            pred_text = "?" if pred == 0 else GESTURE_NAMES[pred]
+            self.hud.text("detected", f"Detected: {pred_text}", (home_x, home_y + home_size + 30),
+                          cv2.FONT_HERSHEY_COMPLEX, 1, (0, 255, 255), 2)
+            if key == ord(' ') and pred != 0:
+                self.start_round(pred, now, "Go!")
+        if key == ord('r'):
+            self.start_round(1, now, "Rock")
+        elif key == ord('p'):
+            self.start_round(2, now, "Paper")
+        elif key == ord('s'):
+            self.start_round(3, now, "Scissor")
+        return img
+
+    def handle_waiting_two_player(self, img, key, now, theme):
+        self.hud.text("title_two_player", "2 PLAYERS: SPACE when both hands are up", (20, 50),
+                      cv2.FONT_HERSHEY_COMPLEX, 0.7, theme["text"], 2)
+        pred = self.scheduler.update(self.frame.small, img, now=now) or (0, 0)
+        for i, choice in enumerate(pred):
+            text = f"P{i + 1}: {'?' if choice == 0 else GESTURE_NAMES[choice]}"
+            self.hud.text(f"detected{i}", text, (40 + i * 330, 400), cv2.FONT_HERSHEY_COMPLEX, 1, (0, 255, 255), 2)
+        if key == ord(' '):
+            self.start_round(0, now, "Go!")
+        return img
+
+    def draw_hand_labels(self, img):
+        # Player slot and tracking ID at each hand from the last detection
+        for hand in self.hands:
+            x, y, w, h = hand["bbox"]
+            slot = self.slots.get(hand["id"])
+            label = f"P{slot + 1} #{hand['id']}" if slot is not None else f"#{hand['id']}"
+            cv2.rectangle(img, (x, y), (x + w, y + h), (255, 0, 255), 2)
+            cv2.putText(img, label, (x, max(20, y - 10)), cv2.FONT_HERSHEY_PLAIN, 1.5, (255, 0, 255), 2)
+
+    def handle_countdown(self, img, roi_img, key, now, theme):
+        elapsed = now - self.state_start_time
+        remaining = self.countdown_duration - elapsed
+        bar_w, bar_h = 400, 20
+        bar_x = (self.width - bar_w) // 2
+        bar_y = 400
+        prog = min(1.0, elapsed / self.countdown_duration)
+        cv2.rectangle(img, (bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (50, 50, 50), -1)
+        cv2.rectangle(img, (bar_x, bar_y), (bar_x + int(bar_w * prog), bar_y + bar_h), (0, 255, 255), -1)
+        if remaining > 1:
+            self.hud.text("countdown", "2", (280, 280), cv2.FONT_HERSHEY_COMPLEX, 5, (0, 255, 255), 10)
+            self.audio.say("Two")
+        elif remaining > 0:
+            self.hud.text("countdown", "1", (280, 280), cv2.FONT_HERSHEY_COMPLEX, 5, (0, 255, 255), 10)
+            self.audio.say("One")
+        else:
+            # Countdown is over – drop any cue that has not been spoken yet
+            self.audio.cancel()
+            self.finish_round(img, roi_img, now)
+        return img
+
+    def finish_round_two_player(self, img, now):
+        p1, p2 = self.classify(img)
+        if p1 == 0 or p2 == 0:
+            self.status_text = "Need two hands"
+            self.computer_choice = 0
+            self.audio.play("draw")
+        else:
+            # P2 takes the computer's seat in the round logic
+            status, self.match_scores[0], self.match_scores[1], self.computer_choice = RPSGame.Game(
+                p1, self.match_scores[0], self.match_scores[1], p2)
+            self.status_text = status.replace("Player", "P1").replace("Computer", "P2")
+            self.audio.play("draw" if status == "Draw" else "win")
+        self.set_state(STATE_RESULT, now)
+
+    def finish_round(self, img, roi_img, now):
+        if self.two_player:
+            return self.finish_round_two_player(img, now)
+        # The computer commits to its move before the player's gesture is read
+        computer_choice = self.opponent.choose()
+        if self.can_classify():
+            self.player_choice = self.classify(img)
+            if self.player_choice == 0:
+                self.player_choice = 1
+        status, self.player_score, self.computer_score, self.computer_choice = RPSGame.Game(
+            self.player_choice, self.player_score, self.computer_score, computer_choice)
+        self.opponent.observe(self.player_choice)
+        if "Player Wins" in status:
+            result = "win"
+        elif "Computer" in status:
+            result = "lose"
+        else:
+            result = "draw"
+        self.audio.play(result)
+        self.scores.record_round(result, self.player_score, self.computer_score)
+        self.status_text = status
+        self.set_state(STATE_RESULT, now)
+
+    def handle_result(self, img, roi_img, key, now, theme):
+        elapsed = now - self.state_start_time
+        idx = [0, 2, 1, 0][self.computer_choice]
+        overlay = self.overlays[idx] if self.computer_choice else None
+        if overlay is not None:
+            self.hud.image("overlay", overlay, self.width - overlay.shape[1], 0, idx)
+        if "Player Wins" in self.status_text or "P1 Wins" in self.status_text:
+            col = theme["win"]
+        elif "Computer" in self.status_text or "P2 Wins" in self.status_text:
+            col = theme["lose"]
+        else:
+            col = theme["draw"]
+        self.hud.text("title", self.status_text, (100, 250), cv2.FONT_HERSHEY_COMPLEX, 2, col, 5)
+        if elapsed > self.result_duration:
+            self.state = STATE_WAITING
+            self.scheduler.reset()
+            self.player_choice = 0
+            self.status_text = IDLE_STATUS
+        return img
+
+    def handle_paused(self, img, roi_img, key, now, theme):
+        self.hud.dim("dim", 0.5)
+        data = self.score_data
+        lines = [
+            "PAUSED",
+            f"Difficulty: {self.difficulty.title()}",
+            f"Theme: {self.theme_name.title()}",
+            f"High Score: {data.get('high_score', 0)}",
+            f"Wins: {data.get('total_wins', 0)}  Losses: {data.get('total_losses', 0)}",
+            "Press 'p' to resume",
+        ]
+        self.hud.text("title", lines, (20, 30))
+        lb = ["Leaderboard:"] + [f"{i+1}. {entry['score']}" for i, entry in enumerate(data.get("leaderboard", []))]
+        self.hud.text("leaderboard", lb, (self.width - 250, 30))
+        return img
+
+    # -- frame loop ------------------------------------------------------------
+    def step(self, img, key=Game_Display.NO_KEY):
+        """Run one (already flipped) frame through the state machine.
+
+        Returns the rendered frame, or None when the player asked to quit.
+        run() passes the FrameContext canvas; any other image is copied into
+        the context first.
+        """
+        if img is not self.frame.canvas:
+            img = self.frame.begin(img, flip=False)
+        if key != Game_Display.NO_KEY:
+            self.audio.play("click")
+        now = self.clock()
+
+        # 'q' closes the help screen first, then quits
+        if key == ord('q'):
+            if now < self.help_until:
+                self.help_until = 0
+                key = Game_Display.NO_KEY
+            else:
+                return None
+
+        self.timer.start("draw")
+        theme = THEMES[self.theme_name]
+        self.hud.begin()
+
+        # Follow the hand while the ROI is in use (labels stay at the home box)
+        if self.roi_tracker is not None and self.state in ROI_STATES and now >= self.help_until:
+            self.roi_x, self.roi_y, self.roi_size = self.roi_tracker.update(self.frame, self.timer)
+            self.frame.set_roi(self.roi_x, self.roi_y, self.roi_size)
+
+        # Draw ROI (two-player mode uses the whole frame)
+        x, y, size = self.roi_x, self.roi_y, self.roi_size
+        if self.roi_tracker is not None:
+            # Moves most frames, so drawn directly instead of re-rendering a sprite
+            cv2.rectangle(img, (x, y), (x + size, y + size), theme["roi"], 2)
+        elif not self.two_player:
+            self.hud.rectangle("roi", (x, y), (x + size, y + size), theme["roi"], 2)
+        # Classifiers read the ROI from the clean frame, so the box border is never included
+        roi_img = self.frame.roi
+
+        key = self.handle_keys(key, now)
+        if now < self.help_until:
+            # Help screen holds the game for 5 seconds (or until 'q')
+            self.hud.text("help", HELP_LINES, (20, 30))
+        else:
+            img = self.handlers[self.state](img, roi_img, key, now, theme)
+
+        # Draw scores (not while training, where the sample counts use that row) and FPS
+        if self.state == STATE_TRAINING:
+            pass
+        elif self.two_player:
+            self.draw_hand_labels(img)
+            self.hud.text("score_left", f"P1: {self.match_scores[0]}", (30, 440), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 0), 2)
+            self.hud.text("score_right", f"P2: {self.match_scores[1]}", (430, 440), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 0), 2)
+        else:
+            self.hud.text("score_right", f"Player: {self.player_score}", (430, 440), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 0), 2)
+            self.hud.text("score_left", f"Comp: {self.computer_score}", (30, 440), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 0), 2)
+        # Static HUD layers in one blend; the FPS counter changes every frame so it is drawn directly
+        self.hud.draw(img)
+        cv2.putText(img, f"FPS: {int(self.timer.fps())}", (500, 50), cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
+        self.timer.stop("draw")
+        if self.show_profile:
+            with self.timer.stage("overlay"):
+                self.timer.draw_overlay(img, 10, 150)
+        return img
+
+    def run(self):
+        self.audio.start(background=True)
+        self.running = True
+        while self.running:
+            self.timer.begin_frame()
+            with self.timer.stage("capture"):
+                success, img = self.capture.read()
+            if not success or img is None:
+                if getattr(self.capture, "finished", False):
+                    print("[RPS] Video source finished")
+                    break
+                print("[RPS] Warning: failed to read frame")
+                time.sleep(0.1)
+                continue
+            self.clock.tick()
+            with self.timer.stage("flip"):
+                img = self.frame.begin(img)
+            with self.timer.stage("input"):
+                key = self.display.poll_key(1)
+            img = self.step(img, key)
+            if img is None:
+                break
+            with self.timer.stage("display"):
+                self.display.show(img)
+            self.timer.end_frame()
+            if self.startup is not None and self.startup.first_frame is None:
+                self.startup.frame_shown()
+        self.running = False
+        return self.report()
+
+    def report(self):
+        report = self.timer.report()
+        if hasattr(self.capture, "stats"):
+            report["capture"] = self.capture.stats()
+        report["prediction"] = self.scheduler.stats()
+        report["frame_context"] = self.frame.stats()
+        report["hud"] = self.hud.stats()
+        if self.roi_tracker is not None:
+            report["roi_tracker"] = self.roi_tracker.stats()
+        report["scores"] = {"player": self.player_score, "computer": self.computer_score}
+        if self.two_player:
+            report["scores"]["two_player"] = {"p1": self.match_scores[0], "p2": self.match_scores[1]}
+        return report
+
+    def close(self):
+        # Samples added live after the last SPACE are kept for next time
+        if self.classifier is not None:
+            self.classifier.flush()
+        self.scores.close()
+        self.audio.close()
+        self.capture.release()
+        self.display.close()
+        self.timer.close()
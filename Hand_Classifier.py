@@ -1,61 +1,220 @@
-import cv2
 import numpy as np
 import os
 
+import Dataset_Stream
+import Feature_Index
+import Feature_Pipeline
+import Model_Format
+import Sample_Store
+
 class HandClassifier:
-    def __init__(self, model_path="model.xml"):
-        self.samples = []
-        self.labels = []
-        self.model = cv2.ml.KNearest_create()
+    """kNN hand-gesture classifier with online training.
+
+    Samples live in a SampleStore that is saved with the model, so loading a
+    model and adding more samples never loses the old ones. Once trained,
+    add_sample() also writes straight into the search index, so new samples
+    count from the next prediction and train() only has to rebuild the index
+    when it was never built. max_per_class bounds memory via per-class
+    reservoir sampling (see Sample_Store). quantize=True keeps samples as
+    1-byte codes (see Feature_Pipeline) at a quarter of the memory; a float
+    model loaded this way is converted and saved quantized on flush().
+    """
+
+    def __init__(self, model_path="model.rpsm", index="brute", index_options=None, k=3, pipeline=None,
+                 max_per_class=None, quantize=False):
+        self.store = Sample_Store.SampleStore(per_class=max_per_class)
+        # Nearest-neighbour backend: "brute", "pca" or "ivf" (see Feature_Index)
+        self.index_kind = index
+        self.index_options = index_options or {}
+        self.model = Feature_Index.make_index(index, **self.index_options)
+        self.k = k
         self.is_trained = False
-        self.img_size = (32, 32) # Smaller = faster processing
-        self.model_path = model_path
+        self.dirty = False # samples added since the last save
+        # Feature extraction (grayscale 32x32 pixels by default – smaller = faster).
+        # A saved model brings its own pipeline, including the fitted PCA.
+        self.quantize = quantize
+        self.pipeline = pipeline or Feature_Pipeline.FeaturePipeline(img_size=(32, 32), quantize=quantize)
+        # model_path=None keeps the classifier in memory only (no load/save)
+        self.model_path = self.legacy_path = None
+        if model_path is None:
+            return
+        # Legacy model.xml paths are converted to the binary format on first load
+        base, ext = os.path.splitext(model_path)
+        is_legacy = ext.lower() in (".xml", ".yml", ".yaml")
+        self.model_path = base + ".rpsm" if is_legacy else model_path
+        self.legacy_path = model_path if is_legacy else base + ".xml"
         self.load_model()
 
+    @property
+    def img_size(self):
+        return self.pipeline.img_size
+
+    @property
+    def train_features(self):
+        return self.store.features
+
+    @property
+    def train_labels(self):
+        return self.store.labels
+
     def process_image(self, img):
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        # Resize
-        resized = cv2.resize(gray, self.img_size)
-        # Flatten
-        return resized.reshape(-1).astype(np.float32)
+        return self.pipeline.transform(img)
+
+    def _store_sample(self, features, label):
+        row, replaced = self.store.append(features, label)
+        if row is None:
+            return False
+        self.dirty = True
+        # Keep a built index in step with the store (store row == index row)
+        if self.is_trained:
+            if replaced:
+                self.model.set_row(row, features, label)
+            else:
+                self.model.add(features.reshape(1, -1), [label])
+        return True
 
     def add_sample(self, img, label):
-        # label: 1=Rock, 2=Paper, 3=Scissor
-        features = self.process_image(img)
-        self.samples.append(features)
-        self.labels.append(label)
-        # print(f"Added sample for class {label}. Total samples: {len(self.samples)}")
+        # label: 1=Rock, 2=Paper, 3=Scissor. Returns False if the reservoir skipped it.
+        return self._store_sample(self.process_image(img), label)
+
+    def add_features(self, features, labels):
+        # Raw (pre-PCA) feature rows, e.g. from Dataset_Stream.stream_features()
+        features = self.pipeline.encode(np.asarray(features, dtype=np.float32))
+        if self.is_trained:
+            for vec, label in zip(features, labels):
+                self._store_sample(vec, label)
+        else:
+            self.store.extend(features, labels)
+            self.dirty = True
+        return len(labels)
+
+    def add_dataset(self, items, workers=None, chunk_size=64, augmenter=None, copies=0, progress=None, seed=0):
+        """Bulk-load (image_path, label) pairs, e.g. from Dataset_Stream.walk_dataset().
+
+        Images are decoded (plus `copies` augmented versions) in worker
+        processes and added chunk by chunk, so memory stays bounded (see
+        Dataset_Stream.stream_features). progress(images, samples) is called
+        after every chunk. Returns the number of samples added.
+        """
+        images = samples = 0
+        chunks = Dataset_Stream.stream_features(items, self.pipeline, augmenter, copies, workers, chunk_size,
+                                                seed=seed)
+        for features, labels, read in chunks:
+            if len(labels):
+                self.add_features(features, labels)
+            images += read
+            samples += len(labels)
+            if progress:
+                progress(images, samples)
+        return samples
 
-    def train(self):
-        if len(self.samples) < 3:
+    def sample_count(self, label=None):
+        return self.store.count(label)
+
+    def train(self, rebuild=False):
+        if self.sample_count() < 3:
             print("Not enough samples to train.")
             return False
-        
-        samples_array = np.array(self.samples, dtype=np.float32)
-        labels_array = np.array(self.labels, dtype=np.int32)
-        
-        self.model.train(samples_array, cv2.ml.ROW_SAMPLE, labels_array)
+
+        # First training run with PCA configured: fit the projection and reduce
+        # (and quantize, since int8 codes need the fitted projection's range)
+        if self.pipeline.pca_components and not self.pipeline.fitted:
+            self.pipeline.fit(self.store.features)
+            self.store.replace_all(self.pipeline.encode(self.store.features), self.store.labels)
+            rebuild = True
+
+        # The index already holds every sample added since it was built, so it
+        # is only rebuilt the first time (or on request, e.g. to re-cluster IVF)
+        if rebuild or not self.is_trained or len(self.model) != len(self.store):
+            self.model = Feature_Index.make_index(self.index_kind, **self.index_options)
+            self.model.fit(self.store.features.copy(), self.store.labels.copy())
         self.is_trained = True
         print("Model trained successfully!")
-        self.save_model()
+        if self.model_path:
+            self.save_model()
         return True
 
     def save_model(self):
         try:
-            self.model.save(self.model_path)
+            self._release_mapped()
+            arrays = {"features": self.store.features, "labels": self.store.labels}
+            arrays.update(self.pipeline.arrays())
+            meta = {"pipeline": self.pipeline.to_meta(), "samples": self.store.meta()}
+            Model_Format.save_arrays(self.model_path, arrays, meta)
+            self.dirty = False
             print(f"Model saved to {self.model_path}")
         except Exception as e:
             print(f"Failed to save model: {e}")
 
+    def _release_mapped(self):
+        # Rows still read from the loaded file would keep it mapped and make the
+        # save fail on Windows; copy them into memory (once) before writing
+        arrays = (self.store.buffer, self.store.label_buffer,
+                  getattr(self.model, "_data", None), getattr(self.model, "_labels", None))
+        if not any(Model_Format.is_mapped(arr) for arr in arrays):
+            return
+        self.store.detach()
+        if self.is_trained:
+            self.model = Feature_Index.make_index(self.index_kind, **self.index_options)
+            self.model.fit(self.store.features.copy(), self.store.labels.copy())
+
+    def flush(self):
+        # Persist live-added samples (called on exit)
+        if self.dirty and self.is_trained and self.model_path:
+            self.save_model()
+
     def load_model(self):
-        if os.path.exists(self.model_path):
-            try:
-                self.model = cv2.ml.KNearest_load(self.model_path)
-                self.is_trained = True
-                print(f"Model loaded from {self.model_path}")
-            except Exception as e:
-                print(f"Failed to load model: {e}")
+        try:
+            meta = {}
+            if os.path.exists(self.model_path):
+                arrays, meta = Model_Format.load_arrays(self.model_path)
+                # Features stay memory-mapped until saving (see _release_mapped);
+                # the labels are small, so they are copied
+                features, labels = arrays["features"], np.array(arrays["labels"])
+                self.pipeline = Feature_Pipeline.FeaturePipeline.from_meta(
+                    meta.get("pipeline", {"img_size": meta.get("img_size", (32, 32))}), arrays)
+            elif os.path.exists(self.legacy_path):
+                print(f"Converting {self.legacy_path} to {self.model_path}...")
+                features, labels = Model_Format.convert_xml(self.legacy_path, self.model_path)
+                self.pipeline = Feature_Pipeline.FeaturePipeline(img_size=(32, 32))
+            else:
+                return
+            if self.quantize and not self.pipeline.quantize:
+                features = self._quantize_loaded(features)
+            # Store and index use the memory-mapped rows directly; both copy on first write
+            self.store.extend(features, labels)
+            self.store.restore_seen(meta.get("samples"))
+            if len(self.store) < len(labels):
+                # max_per_class is below the saved sample count: keep the reservoir's pick
+                features, labels = self.store.features.copy(), self.store.labels.copy()
+            self.model = Feature_Index.make_index(self.index_kind, **self.index_options)
+            self.model.fit(features, labels)
+            self.is_trained = True
+            print(f"Model loaded from {self.model_path}")
+        except Exception as e:
+            print(f"Failed to load model: {e}")
+
+    def _quantize_loaded(self, features):
+        self.pipeline.quantize = True
+        if self.pipeline.fitted:
+            self.pipeline.calibrate(features)
+        self.dirty = True
+        codes = self.pipeline.quantize_features(features)
+        print(f"Quantized model to {codes.dtype} ({features.nbytes // 1024} KB -> {codes.nbytes // 1024} KB)")
+        return codes
+
+    def footprint(self):
+        # Bytes held by the stored samples and by the search index
+        return {
+            "dtype": str(self.store.features.dtype),
+            "samples_bytes": int(self.store.buffer.nbytes + self.store.label_buffer.nbytes),
+            "index_bytes": int(self.model.nbytes()),
+        }
+
+    def predict_features(self, features):
+        # Classify a (n, dim) feature matrix in one index query
+        idx, dists = self.model.search(features, self.k)
+        return Feature_Index.vote(self.model.labels[idx], dists)
 
     def predict(self, img):
         if not self.is_trained:
@@ -64,5 +223,4 @@ class HandClassifier:
         features = self.process_image(img)
         features = features.reshape(1, -1)
         
-        ret, results, neighbours, dist = self.model.findNearest(features, k=3)
-        return int(results[0][0])
+        return int(self.predict_features(features)[0])
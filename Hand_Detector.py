@@ -1,35 +1,111 @@
 import cv2
+import importlib.util
 import math
 
-# Try to import MediaPipe; if unavailable we provide a dummy detector.
-try:
-    import mediapipe as mp
-    HAS_MEDIAPIPE = True
-except ImportError:
-    HAS_MEDIAPIPE = False
+# MediaPipe is heavy to import, so only check that it is installed here; the
+# module is imported (and its graphs built) the first time a detector needs it.
+# If unavailable we provide a dummy detector.
+HAS_MEDIAPIPE = importlib.util.find_spec("mediapipe") is not None
+if not HAS_MEDIAPIPE:
     print("Warning: MediaPipe not found. Hand detection will be disabled.")
 
+_mp = None
+
+def load_mediapipe():
+    global _mp
+    if _mp is None:
+        import mediapipe
+        _mp = mediapipe
+    return _mp
+
+class HandTracker:
+    """Stable IDs for the hands of consecutive frames.
+
+    Hands are matched to existing tracks greedily by centre distance
+    (closest pairs first). A track survives max_missing frames without a
+    match, so a hand that is briefly lost keeps its ID.
+    """
+
+    def __init__(self, max_distance=150, max_missing=10):
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.tracks = {} # id -> [center, frames missing]
+        self.next_id = 1
+
+    def update(self, hands):
+        # hands: dicts with a "center" (as from findAllPositions); each gets an "id"
+        pairs = []
+        for tid, (center, _) in self.tracks.items():
+            for i, hand in enumerate(hands):
+                d = math.hypot(hand["center"][0] - center[0], hand["center"][1] - center[1])
+                if d <= self.max_distance:
+                    pairs.append((d, tid, i))
+        used_tracks, used_hands = set(), set()
+        for _, tid, i in sorted(pairs):
+            if tid in used_tracks or i in used_hands:
+                continue
+            hands[i]["id"] = tid
+            used_tracks.add(tid)
+            used_hands.add(i)
+        for i, hand in enumerate(hands):
+            if i not in used_hands:
+                hand["id"] = self.next_id
+                self.next_id += 1
+        for tid in list(self.tracks):
+            if tid not in used_tracks:
+                self.tracks[tid][1] += 1
+                if self.tracks[tid][1] > self.max_missing:
+                    del self.tracks[tid]
+        for hand in hands:
+            self.tracks[hand["id"]] = [hand["center"], 0]
+        return hands
+
+    def reset(self):
+        self.tracks = {}
+
+
 if HAS_MEDIAPIPE:
     class handDetector:
-        def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5):
+        def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5, eager=False):
             self.mode = mode
             self.maxHands = maxHands
             self.detectionCon = detectionCon
             self.trackCon = trackCon
-            self.mpHands = mp.solutions.hands
-            self.hands = self.mpHands.Hands(
-                self.mode,
-                self.maxHands,
-                min_detection_confidence=self.detectionCon,
-                min_tracking_confidence=self.trackCon,
-            )
-            self.mpDraw = mp.solutions.drawing_utils
-            self.mpFaceDetection = mp.solutions.face_detection
-            self.faceDetection = self.mpFaceDetection.FaceDetection(0.75)
             self.tipIds = [4, 8, 12, 16, 20]
+            # Graphs are built on first use: Hands on findHands, FaceDetection
+            # only if findFaces is ever called
+            self._hands = None
+            self._faceDetection = None
+            self.results = None
+            if eager:
+                self.hands
+
+        @property
+        def hands(self):
+            if self._hands is None:
+                mp = load_mediapipe()
+                self.mpHands = mp.solutions.hands
+                self.mpDraw = mp.solutions.drawing_utils
+                self._hands = self.mpHands.Hands(
+                    self.mode,
+                    self.maxHands,
+                    min_detection_confidence=self.detectionCon,
+                    min_tracking_confidence=self.trackCon,
+                )
+            return self._hands
 
-        def findHands(self, img, draw=True):
-            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        @property
+        def faceDetection(self):
+            if self._faceDetection is None:
+                mp = load_mediapipe()
+                self.mpFaceDetection = mp.solutions.face_detection
+                self._faceDetection = self.mpFaceDetection.FaceDetection(0.75)
+            return self._faceDetection
+
+        def findHands(self, img, draw=True, rgb=None):
+            # rgb: the frame already converted to RGB (e.g. FrameContext.rgb), so
+            # the conversion is shared with other consumers of the same frame
+            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB) if rgb is None else rgb
             self.results = self.hands.process(imgRGB)
             if self.results.multi_hand_landmarks and draw:
                 for handLms in self.results.multi_hand_landmarks:
@@ -38,7 +114,7 @@ if HAS_MEDIAPIPE:
 
         def findPosition(self, img, handNo=0, draw=True):
             self.lmList = []
-            if self.results.multi_hand_landmarks:
+            if self.results is not None and self.results.multi_hand_landmarks:
                 myHand = self.results.multi_hand_landmarks[handNo]
                 for id, lm in enumerate(myHand.landmark):
                     h, w, _ = img.shape
@@ -48,6 +124,30 @@ if HAS_MEDIAPIPE:
                         cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
             return self.lmList
 
+        def findAllPositions(self, img, draw=False):
+            # Every hand found by the last findHands call (one hands.process per
+            # frame, however many hands), with its bounding box, centre and side
+            hands = []
+            if self.results is None or not self.results.multi_hand_landmarks:
+                return hands
+            h, w, _ = img.shape
+            handedness = self.results.multi_handedness or []
+            for i, handLms in enumerate(self.results.multi_hand_landmarks):
+                lmList = [[id, int(lm.x * w), int(lm.y * h)] for id, lm in enumerate(handLms.landmark)]
+                xs = [p[1] for p in lmList]
+                ys = [p[2] for p in lmList]
+                hand = {
+                    "lmList": lmList,
+                    "bbox": (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)),
+                    "center": (sum(xs) // len(xs), sum(ys) // len(ys)),
+                }
+                if i < len(handedness):
+                    hand["type"] = handedness[i].classification[0].label
+                hands.append(hand)
+                if draw:
+                    cv2.rectangle(img, hand["bbox"], (255, 0, 255), 2)
+            return hands
+
         def fingersUp(self, lmList, handNo=0):
             if not lmList:
                 return []
@@ -65,8 +165,8 @@ if HAS_MEDIAPIPE:
                     fingers.append(0)
             return fingers
 
-        def findFaces(self, img, draw=True):
-            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        def findFaces(self, img, draw=True, rgb=None):
+            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB) if rgb is None else rgb
             self.resultsFace = self.faceDetection.process(imgRGB)
             bboxs = []
             if self.resultsFace.detections:
@@ -116,13 +216,15 @@ else:
     class handDetector:
         def __init__(self, *_, **__):
             pass
-        def findHands(self, img, draw=True):
+        def findHands(self, img, draw=True, rgb=None):
             return img
         def findPosition(self, img, handNo=0, draw=True):
             return []
+        def findAllPositions(self, img, draw=False):
+            return []
         def fingersUp(self, lmList, handNo=0):
             return []
-        def findFaces(self, img, draw=True):
+        def findFaces(self, img, draw=True, rgb=None):
             return []
         def fancyDraw(self, img, bbox, l=30, t=5, rt=1):
             return img
\ No newline at end of file
@@ -0,0 +1,152 @@
+import cv2
+import numpy as np
+
+
+class Sprite:
+    """A pre-rendered BGRA patch at a fixed position on the frame."""
+
+    def __init__(self, x, y, bgr, alpha):
+        self.x, self.y = x, y
+        self.bgr = bgr
+        self.alpha = alpha  # uint8, 255 = opaque
+        # Ink is either fully on or off (text and boxes), so it can be copied through a mask
+        self.opaque = bool(np.all((alpha == 0) | (alpha == 255)))
+
+
+def render(draw, size):
+    # Run draw(canvas, color_fn) on a blank frame-sized canvas and on a mask,
+    # then crop both to the ink. color_fn maps a BGR colour to what should be
+    # drawn on the canvas being passed (the colour itself, or 255 on the mask).
+    width, height = size
+    bgr = np.zeros((height, width, 3), dtype=np.uint8)
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    draw(bgr, lambda color: color)
+    draw(alpha, lambda color: 255)
+    ys, xs = np.nonzero(alpha)
+    if len(xs) == 0:
+        return None
+    x0, x1, y0, y1 = xs.min(), xs.max() + 1, ys.min(), ys.max() + 1
+    return Sprite(x0, y0, bgr[y0:y1, x0:x1].copy(), alpha[y0:y1, x0:x1].copy())
+
+
+class HudCompositor:
+    """Caches the static parts of the HUD and blends them in one pass per frame.
+
+    Each frame the game registers its layers (text, images, a dimmed
+    backdrop) under a slot name with a version; a slot is only re-rendered
+    when its version changes (e.g. new score, theme or difficulty). The
+    layers are flattened into one premultiplied composite, which is rebuilt
+    only when the set of layers or any version changed. draw() is then a
+    single masked copy over the HUD's bounding box, or, when translucent
+    layers are present, frame * (1 - alpha) + premultiplied colour.
+    """
+
+    def __init__(self, width=640, height=480):
+        self.size = (width, height)
+        self.sprites = {}  # slot -> (version, Sprite)
+        self.layers = []
+        self.signature = None
+        self.composite = None  # (x0, y0, x1, y1, inverse alpha, premultiplied bgr, opaque mask)
+        self.renders = 0
+        self.rebuilds = 0
+        self.frames = 0
+
+    def begin(self):
+        self.layers = []
+
+    def add(self, slot, version, build):
+        # build() -> Sprite (or None); only called when the slot's version changed
+        cached = self.sprites.get(slot)
+        if cached is None or cached[0] != version:
+            cached = (version, build())
+            self.sprites[slot] = cached
+            self.renders += 1
+        self.layers.append((slot, version))
+
+    def text(self, slot, lines, org, font=cv2.FONT_HERSHEY_PLAIN, scale=1.0, color=(255, 255, 255),
+             thickness=1, line_step=30):
+        if isinstance(lines, str):
+            lines = (lines,)
+        version = (tuple(lines), org, font, scale, color, thickness, line_step)
+        def draw(canvas, ink):
+            for i, line in enumerate(lines):
+                cv2.putText(canvas, line, (org[0], org[1] + i * line_step), font, scale, ink(color), thickness)
+        self.add(slot, version, lambda: render(draw, self.size))
+
+    def rectangle(self, slot, pt1, pt2, color, thickness=1):
+        def draw(canvas, ink):
+            cv2.rectangle(canvas, pt1, pt2, ink(color), thickness)
+        self.add(slot, (pt1, pt2, color, thickness), lambda: render(draw, self.size))
+
+    def image(self, slot, img, x, y, version):
+        self.add(slot, version, lambda: Sprite(x, y, img, np.full(img.shape[:2], 255, dtype=np.uint8)))
+
+    def dim(self, slot, amount=0.5):
+        # Full-frame black backdrop at the given opacity
+        width, height = self.size
+        alpha = int(round(amount * 255))
+        self.add(slot, amount, lambda: Sprite(0, 0, np.zeros((height, width, 3), dtype=np.uint8),
+                                              np.full((height, width), alpha, dtype=np.uint8)))
+
+    def _rebuild(self):
+        sprites = [self.sprites[slot][1] for slot, _ in self.layers]
+        sprites = [s for s in sprites if s is not None]
+        self.rebuilds += 1
+        if not sprites:
+            self.composite = None
+            return
+        width, height = self.size
+        x0 = max(0, min(s.x for s in sprites))
+        y0 = max(0, min(s.y for s in sprites))
+        x1 = min(width, max(s.x + s.bgr.shape[1] for s in sprites))
+        y1 = min(height, max(s.y + s.bgr.shape[0] for s in sprites))
+        if all(s.opaque for s in sprites):
+            # Common case, text and boxes only: masked copies, no float maths
+            color = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+            mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            for s, src, alpha, dst in self._clipped(sprites, x0, y0, x1, y1):
+                cv2.copyTo(src, alpha, color[dst])
+                np.maximum(mask[dst], alpha, out=mask[dst])
+            self.composite = (x0, y0, x1, y1, None, color, mask)
+            return
+
+        # Translucent layers (e.g. the pause backdrop): "over" operator in premultiplied form
+        color = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.float32)
+        cover = np.zeros((y1 - y0, x1 - x0, 1), dtype=np.float32)
+        for s, src, alpha, dst in self._clipped(sprites, x0, y0, x1, y1):
+            a = alpha[:, :, None].astype(np.float32) / 255
+            color[dst] = src * a + color[dst] * (1 - a)
+            cover[dst] = a + cover[dst] * (1 - a)
+        inverse = np.repeat(np.round((1 - cover) * 255).astype(np.uint8), 3, axis=2)
+        self.composite = (x0, y0, x1, y1, inverse, np.round(color).astype(np.uint8), None)
+
+    @staticmethod
+    def _clipped(sprites, x0, y0, x1, y1):
+        # (sprite, colour, alpha, composite slice) for the part of each sprite inside the box
+        for s in sprites:
+            sx0, sy0 = max(s.x, x0), max(s.y, y0)
+            sx1, sy1 = min(s.x + s.bgr.shape[1], x1), min(s.y + s.bgr.shape[0], y1)
+            if sx1 <= sx0 or sy1 <= sy0:
+                continue
+            src = (slice(sy0 - s.y, sy1 - s.y), slice(sx0 - s.x, sx1 - s.x))
+            yield s, s.bgr[src], s.alpha[src], (slice(sy0 - y0, sy1 - y0), slice(sx0 - x0, sx1 - x0))
+
+    def draw(self, img):
+        self.frames += 1
+        signature = tuple(self.layers)
+        if signature != self.signature:
+            self._rebuild()
+            self.signature = signature
+        if self.composite is None:
+            return img
+        x0, y0, x1, y1, inverse, color, mask = self.composite
+        roi = img[y0:y1, x0:x1]
+        if mask is not None:
+            cv2.copyTo(color, mask, roi)
+        else:
+            cv2.multiply(roi, inverse, dst=roi, scale=1 / 255)
+            cv2.add(roi, color, dst=roi)
+        return img
+
+    def stats(self):
+        return {"frames": self.frames, "sprite_renders": self.renders, "composite_rebuilds": self.rebuilds}
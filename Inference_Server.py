@@ -0,0 +1,509 @@
+import argparse
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+import struct
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import Hand_Classifier
+import Landmark_Classifier
+import Opponent_Engine
+import Perf_Profiler
+import Session_Manager
+
+# Local inference server for game.html (standard library asyncio, no web framework):
+#
+#   python Inference_Server.py --port 8765   then open http://localhost:8765/
+#
+#   GET  /            game.html
+#   POST /api/predict {"image": <JPEG/PNG data URL or base64>} or {"landmarks": [[x, y], ...]}
+#   POST /api/round   same, or {"move": "rock"}, plus "session": <id>; plays one round
+#   GET  /api/stats   batch sizes and latency percentiles
+#   GET  /ws          WebSocket: JSON messages {"type": "predict" | "round", "id": ..., ...};
+#                     each reply echoes "id", and a connection is one session
+#
+# Images are decoded and turned into features on a thread pool; the feature
+# vectors of all requests that arrive together are then classified in one
+# index query (see MicroBatcher), which is where the time goes under load.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MOVES = {"rock": 1, "paper": 2, "scissors": 3}
+NAMES = {label: name for name, label in MOVES.items()}
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY = 4 * 1024 * 1024
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class RequestTooLarge(Exception):
+    """Request body over MAX_BODY (answered with 413)."""
+
+
+def decode_image(data):
+    # data URL ("data:image/jpeg;base64,...") or bare base64 -> BGR image.
+    # Anything a client can get wrong raises ValueError (answered with 400)
+    if not isinstance(data, str):
+        raise ValueError("image must be a data URL or base64 string")
+    if "," in data[:64]:
+        data = data.split(",", 1)[1]
+    try:
+        buf = np.frombuffer(base64.b64decode(data), dtype=np.uint8)
+        img = cv2.imdecode(buf, cv2.IMREAD_COLOR) if len(buf) else None
+    except (binascii.Error, cv2.error):
+        img = None
+    if img is None:
+        raise ValueError("image could not be decoded")
+    return img
+
+
+def parse_move(move):
+    if isinstance(move, str):
+        move = MOVES.get(move.lower(), 0)
+    if move not in (1, 2, 3):
+        raise ValueError("move must be rock, paper, scissors or 1..3")
+    return move
+
+
+def parse_landmarks(points):
+    # [[x, y], ...] (e.g. MediaPipe JS, any units) or [[id, x, y], ...] -> lmList
+    if not isinstance(points, list) or len(points) != Landmark_Classifier.NUM_LANDMARKS:
+        raise ValueError(f"landmarks must be {Landmark_Classifier.NUM_LANDMARKS} points")
+    for p in points:
+        if (not isinstance(p, list) or len(p) not in (2, 3)
+                or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in p)):
+            raise ValueError("each landmark must be a numeric [x, y] or [id, x, y]")
+    return [[i] + p[-2:] for i, p in enumerate(points)]
+
+
+def parse_fingers(fingers):
+    # Optional fingersUp list (thumb .. pinky, 0/1) for the rule fallback
+    if fingers is None:
+        return None
+    if not isinstance(fingers, list) or len(fingers) != 5 or not all(f in (0, 1) for f in fingers):
+        raise ValueError("fingers must be five 0/1 values")
+    return [int(f) for f in fingers]
+
+
+def unmask(payload, mask):
+    # WebSocket masking is its own inverse: XOR with the 4-byte key, vectorized
+    if not payload:
+        return payload
+    data = np.frombuffer(payload, dtype=np.uint8) ^ np.resize(np.frombuffer(mask, dtype=np.uint8), len(payload))
+    return data.tobytes()
+
+
+class MicroBatcher:
+    """Collects concurrent requests and runs them as one batch.
+
+    The first request opens a batch, which closes after max_wait seconds or
+    at max_batch requests. run_batch(items) is then called once on a single
+    worker thread, so the classifier is never used from two threads and the
+    event loop keeps serving sockets meanwhile; requests arriving during a
+    batch queue up and form the next one, so batches grow with load.
+    """
+
+    def __init__(self, run_batch, max_batch=64, max_wait=0.002):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="rps-batch")
+        self.latency = Perf_Profiler.RollingHistogram(window=1000)
+        self.batch_time = Perf_Profiler.RollingHistogram(window=1000)
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+    async def submit(self, item):
+        t0 = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((item, future))
+        try:
+            return await future
+        finally:
+            self.latency.add((time.perf_counter() - t0) * 1000)
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            t0 = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.run_batch, [item for item, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            self.batch_time.add((time.perf_counter() - t0) * 1000)
+            self.batches += 1
+            self.items += len(batch)
+            self.largest = max(self.largest, len(batch))
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.items,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.largest,
+            "latency": self.latency.summary(all_time=True),
+            "batch_time": self.batch_time.summary(all_time=True),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class InferenceService:
+    """Gesture recognition and round play for many sessions.
+
+    prepare() turns one request into a job (decoding and feature extraction,
+    safe to run on any thread); run_batch() classifies every job of a batch
+    with one call per classifier and plays all the rounds with one
+    SessionManager.play_many() call.
+    """
+
+    def __init__(self, classifier, landmark_classifier=None, strategy="mixture", idle_timeout=600.0,
+                 max_sessions=10000):
+        self.classifier = classifier
+        self.landmark_classifier = landmark_classifier
+        self.sessions = Session_Manager.SessionManager(strategy, idle_timeout, max_sessions=max_sessions)
+
+    def prepare(self, message, play=False, session=None):
+        if not isinstance(message, dict):
+            raise ValueError("request must be a JSON object")
+        sid = message.get("session", session or "default")
+        if not isinstance(sid, str) or not sid:
+            raise ValueError("session must be a non-empty string")
+        job = {"play": play, "session": sid}
+        if "image" in message:
+            img = decode_image(message["image"])
+            job["features"] = self.classifier.process_image(img)
+        elif "landmarks" in message:
+            job["landmarks"] = parse_landmarks(message["landmarks"])
+            job["fingers"] = parse_fingers(message.get("fingers"))
+        elif "move" in message and play:
+            job["move"] = parse_move(message["move"])
+        else:
+            raise ValueError("request needs an image, landmarks or (for rounds) a move")
+        return job
+
+    def _gestures(self, jobs):
+        gestures = [job.get("move", 0) for job in jobs]
+        pixel = [i for i, job in enumerate(jobs) if "features" in job]
+        if pixel and self.classifier.is_trained:
+            labels = self.classifier.predict_features(np.stack([jobs[i]["features"] for i in pixel]))
+            for i, label in zip(pixel, labels):
+                gestures[i] = int(label)
+        hands = [i for i, job in enumerate(jobs) if "landmarks" in job]
+        if hands and self.landmark_classifier is not None:
+            labels = self.landmark_classifier.predict_many([jobs[i]["landmarks"] for i in hands],
+                                                           [jobs[i]["fingers"] for i in hands])
+            for i, label in zip(hands, labels):
+                gestures[i] = label
+        return gestures
+
+    def run_batch(self, jobs):
+        gestures = self._gestures(jobs)
+        results = [{"gesture": gesture, "name": NAMES.get(gesture)} for gesture in gestures]
+        plays = [i for i, job in enumerate(jobs) if job["play"]]
+        rounds = self.sessions.play_many([jobs[i]["session"] for i in plays], [gestures[i] for i in plays])
+        for i, played in zip(plays, rounds):
+            if played.get("computer"):
+                played["computer"] = NAMES[played["computer"]]
+            results[i].update(played)
+        return results
+
+
+class InferenceServer:
+    """HTTP/1.1 + WebSocket front end for an InferenceService."""
+
+    def __init__(self, service, max_batch=64, max_wait=0.002, workers=None, static_file=None):
+        self.service = service
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.decoders = ThreadPoolExecutor(workers or os.cpu_count() or 1, thread_name_prefix="rps-decode")
+        self.batcher = None
+        self.static_file = static_file or os.path.join(BASE_DIR, "game.html")
+        self.connections = 0
+
+    async def process(self, message, play, session=None):
+        if not isinstance(message, dict):
+            raise ValueError("request body must be a JSON object")
+        if "image" in message:
+            # Decoding and feature extraction run in parallel, outside the batch
+            loop = asyncio.get_running_loop()
+            job = await loop.run_in_executor(self.decoders, self.service.prepare, message, play, session)
+        else:
+            job = self.service.prepare(message, play, session)
+        return await self.batcher.submit(job)
+
+    def stats(self):
+        stats = self.batcher.stats()
+        stats["sessions"] = self.service.sessions.stats()
+        stats["connections"] = self.connections
+        return stats
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    @staticmethod
+    async def read_request(reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        # Malformed request lines or headers raise ValueError (answered with 400)
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY:
+            raise RequestTooLarge(length)
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?", 1)[0], headers, body
+
+    @staticmethod
+    def respond(writer, status, body=b"", content_type="application/json", keep_alive=True):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    method, path, headers, body = await self.read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except (RequestTooLarge, asyncio.LimitOverrunError):
+                    self.respond(writer, 413, {"error": "request too large"}, keep_alive=False)
+                    break
+                except ValueError:
+                    self.respond(writer, 400, {"error": "malformed request"}, keep_alive=False)
+                    break
+                if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self.websocket(reader, writer, headers)
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.route(writer, method, path, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def route(self, writer, method, path, body, keep_alive):
+        if method == "OPTIONS":
+            self.respond(writer, 204, keep_alive=keep_alive)
+        elif method == "GET" and path in ("/", "/game.html"):
+            with open(self.static_file, "rb") as f:
+                self.respond(writer, 200, f.read(), "text/html; charset=utf-8", keep_alive)
+        elif method == "GET" and path == "/api/stats":
+            self.respond(writer, 200, self.stats(), keep_alive=keep_alive)
+        elif method == "POST" and path in ("/api/predict", "/api/round"):
+            try:
+                reply = await self.process(json.loads(body or b"{}"), path == "/api/round")
+                self.respond(writer, 200, reply, keep_alive=keep_alive)
+            except ValueError as e:  # includes malformed JSON
+                self.respond(writer, 400, {"error": str(e)}, keep_alive=keep_alive)
+            except Exception as e:
+                # Client mistakes are ValueErrors (400); anything else is logged, not echoed
+                print(f"[RPS] Error handling {path}:", repr(e))
+                self.respond(writer, 500, {"error": "internal error"}, keep_alive=keep_alive)
+        else:
+            self.respond(writer, 404, {"error": "not found"}, keep_alive=keep_alive)
+
+    # ------------------------------------------------------------------
+    # WebSocket (RFC 6455, text messages only)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def ws_frame(opcode, payload=b"", mask=None):
+        # mask (4 bytes) is only used by clients, e.g. load_test.py
+        n = len(payload)
+        bit = 0x80 if mask else 0
+        if n < 126:
+            head = struct.pack("!BB", 0x80 | opcode, bit | n)
+        elif n < 1 << 16:
+            head = struct.pack("!BBH", 0x80 | opcode, bit | 126, n)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, bit | 127, n)
+        if mask:
+            return head + mask + unmask(payload, mask)
+        return head + payload
+
+    @staticmethod
+    async def ws_read_frame(reader):
+        b1, b2 = await reader.readexactly(2)
+        length = b2 & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if length > MAX_BODY:
+            raise ValueError("frame too large")
+        mask = await reader.readexactly(4) if b2 & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask:
+            payload = unmask(payload, mask)
+        return bool(b1 & 0x80), b1 & 0x0F, payload
+
+    async def websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        await writer.drain()
+
+        session = uuid.uuid4().hex
+        tasks = set()
+        message = bytearray()
+        try:
+            while True:
+                fin, opcode, payload = await self.ws_read_frame(reader)
+                if opcode == 0x8:  # close
+                    writer.write(self.ws_frame(0x8, payload[:2]))
+                    break
+                if opcode == 0x9:  # ping
+                    writer.write(self.ws_frame(0xA, payload))
+                    continue
+                if opcode in (0x0, 0x1, 0x2):
+                    message += payload
+                    if not fin:
+                        continue
+                    # Every message is handled in its own task, so several
+                    # in-flight messages from one page can share a batch
+                    task = asyncio.create_task(self.ws_message(writer, bytes(message), session))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    message = bytearray()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Session state is only touched from the batch thread
+            await asyncio.get_running_loop().run_in_executor(self.batcher.executor, self.service.sessions.close,
+                                                              session)
+
+    async def ws_message(self, writer, data, session):
+        reply = {}
+        try:
+            message = json.loads(data)
+            if not isinstance(message, dict):
+                raise ValueError("message must be a JSON object")
+            reply["id"] = message.get("id")
+            reply.update(await self.process(message, message.get("type") == "round", session))
+        except ValueError as e:
+            reply["error"] = str(e)
+        except Exception as e:
+            print("[RPS] Error handling WebSocket message:", repr(e))
+            reply["error"] = "internal error"
+        if not writer.is_closing():
+            writer.write(self.ws_frame(0x1, json.dumps(reply).encode()))
+            await writer.drain()
+
+    async def evict_idle(self):
+        # Drop sessions of pages that went quiet without closing (e.g. HTTP clients)
+        loop = asyncio.get_running_loop()
+        sessions = self.service.sessions
+        while True:
+            await asyncio.sleep(max(sessions.idle_timeout / 4, 1.0))
+            evicted = await loop.run_in_executor(self.batcher.executor, sessions.evict_idle)
+            if evicted:
+                print(f"[RPS] Evicted {evicted} idle sessions ({len(sessions)} open)")
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        self.batcher = MicroBatcher(self.service.run_batch, self.max_batch, self.max_wait)
+        batch_task = asyncio.create_task(self.batcher.run())
+        evict_task = asyncio.create_task(self.evict_idle())
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_BODY)
+        print(f"[RPS] Inference server on http://{host}:{port}/ (WebSocket /ws)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+            evict_task.cancel()
+            self.batcher.close()
+            self.decoders.shutdown(wait=False)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve gesture recognition and rounds to game.html")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, "model.rpsm"), help="pixel model (HandClassifier)")
+    parser.add_argument("--landmark-model", default=os.path.join(BASE_DIR, "landmarks.rpsm"))
+    parser.add_argument("--strategy", default="mixture", choices=sorted(Opponent_Engine.STRATEGIES),
+                        help="computer opponent for each session")
+    parser.add_argument("--idle-timeout", type=float, default=600.0,
+                        help="seconds after which a silent session is closed")
+    parser.add_argument("--max-sessions", type=int, default=10000,
+                        help="most open sessions; the least recently used one is closed to make room")
+    parser.add_argument("--max-batch", type=int, default=64, help="most requests classified in one call")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="how long the first request of a batch waits for others")
+    parser.add_argument("--workers", type=int, default=None, help="image decoding threads")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    service = InferenceService(
+        Hand_Classifier.HandClassifier(args.model),
+        Landmark_Classifier.LandmarkClassifier(args.landmark_model),
+        args.strategy,
+        args.idle_timeout,
+        args.max_sessions,
+    )
+    server = InferenceServer(service, args.max_batch, args.max_wait_ms / 1000, args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("[RPS] Server stopped")
@@ -0,0 +1,132 @@
+import numpy as np
+import os
+
+import Feature_Index
+import Model_Format
+import Sample_Store
+
+# 1: Rock, 2: Paper, 3: Scissor (same labels as HandClassifier)
+ROCK, PAPER, SCISSOR = 1, 2, 3
+NUM_LANDMARKS = 21
+
+
+def landmark_features(lmList):
+    # lmList rows are [id, x, y] as returned by handDetector.findPosition.
+    # Translate to the wrist and scale by the hand's extent, so the 42-dim
+    # vector does not depend on where the hand is or how close it is.
+    if len(lmList) != NUM_LANDMARKS:
+        return None
+    pts = np.array([[x, y] for _, x, y in lmList], dtype=np.float32)
+    pts -= pts[0]
+    scale = np.sqrt((pts * pts).sum(axis=1)).max()
+    if scale > 0:
+        pts /= scale
+    return pts.reshape(-1)
+
+
+def gesture_from_fingers(fingers):
+    # Rule-based fallback from handDetector.fingersUp (thumb, index, middle, ring, pinky).
+    # The thumb check is only reliable for right hands, so it is ignored here.
+    if len(fingers) != 5:
+        return 0
+    index, middle, ring, pinky = fingers[1:]
+    if not (index or middle or ring or pinky):
+        return ROCK
+    if index and middle and ring and pinky:
+        return PAPER
+    if index and middle and not ring and not pinky:
+        return SCISSOR
+    return 0
+
+
+class LandmarkClassifier:
+    """KNN over normalized hand landmarks, with a fingersUp rule fallback.
+
+    Samples live in a Sample_Store like HandClassifier's, so a loaded model
+    keeps its samples and training again adds to them. Landmark models are
+    small, so they are read into memory rather than memory-mapped, which
+    leaves the file free to be saved over.
+    """
+
+    def __init__(self, model_path="landmarks.rpsm", k=3):
+        self.store = Sample_Store.SampleStore()
+        self.model = Feature_Index.BruteForceIndex()
+        self.k = k
+        self.is_trained = False
+        self.model_path = model_path
+        self.load_model()
+
+    @property
+    def train_features(self):
+        return self.store.features
+
+    @property
+    def train_labels(self):
+        return self.store.labels
+
+    def add_sample(self, lmList, label):
+        features = landmark_features(lmList)
+        if features is None:
+            return False
+        self.store.append(features, label)
+        return True
+
+    def sample_count(self, label=None):
+        return self.store.count(label)
+
+    def train(self):
+        if self.sample_count() < 3:
+            print("Not enough landmark samples to train.")
+            return False
+        self.model = Feature_Index.BruteForceIndex().fit(self.store.features.copy(), self.store.labels.copy())
+        self.is_trained = True
+        print("Landmark model trained successfully!")
+        self.save_model()
+        return True
+
+    def save_model(self):
+        try:
+            Model_Format.save_arrays(
+                self.model_path,
+                {"features": self.store.features, "labels": self.store.labels},
+                {"features": "landmarks", "landmarks": NUM_LANDMARKS},
+            )
+            print(f"Landmark model saved to {self.model_path}")
+        except Exception as e:
+            print(f"Failed to save landmark model: {e}")
+
+    def load_model(self):
+        if not os.path.exists(self.model_path):
+            return
+        try:
+            arrays, _ = Model_Format.load_arrays(self.model_path, memory_map=False)
+            self.store.extend(arrays["features"], arrays["labels"])
+            self.model = Feature_Index.BruteForceIndex().fit(self.store.features.copy(), self.store.labels.copy())
+            self.is_trained = True
+            print(f"Landmark model loaded from {self.model_path}")
+        except Exception as e:
+            print(f"Failed to load landmark model: {e}")
+
+    def predict_many(self, lmLists, fingers_list=None):
+        # Several hands (e.g. two players) in a single index query
+        fingers_list = fingers_list or [None] * len(lmLists)
+        features = [landmark_features(lmList) for lmList in lmLists]
+        valid = [i for i, f in enumerate(features) if f is not None]
+        out = [0] * len(lmLists)
+        if not self.is_trained:
+            for i in valid:
+                out[i] = gesture_from_fingers(fingers_list[i] or [])
+        elif valid:
+            idx, dists = self.model.search(np.stack([features[i] for i in valid]), self.k)
+            for i, label in zip(valid, Feature_Index.vote(self.model.labels[idx], dists)):
+                out[i] = int(label)
+        return out
+
+    def predict(self, lmList, fingers=None):
+        features = landmark_features(lmList)
+        if features is None:
+            return 0 # No hand
+        if self.is_trained:
+            idx, dists = self.model.search(features.reshape(1, -1), self.k)
+            return int(Feature_Index.vote(self.model.labels[idx], dists)[0])
+        return gesture_from_fingers(fingers or [])
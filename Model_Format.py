@@ -0,0 +1,103 @@
+import cv2
+import json
+import mmap
+import numpy as np
+import os
+import struct
+
+# Binary model file layout:
+#   b"RPSM" | uint32 version | uint32 header length | JSON header | arrays
+# The JSON header lists every array's dtype, shape and byte offset; arrays are
+# stored raw and 64-byte aligned so they can be memory-mapped without copying.
+MAGIC = b"RPSM"
+VERSION = 1
+ALIGN = 64
+PREFIX = struct.Struct("<4sII")
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def is_mapped(arr):
+    # True if arr is (a view of) a memory-mapped file, e.g. from load_arrays()
+    while arr is not None:
+        if isinstance(arr, (np.memmap, mmap.mmap)):
+            return True
+        arr = getattr(arr, "base", None)
+    return False
+
+
+def save_arrays(path, arrays, meta=None):
+    # The new file replaces path in one step, which Windows refuses while any
+    # array from load_arrays(path) still maps it: copy whatever you keep from
+    # a loaded model (and drop the memmaps) before saving over it.
+    arrays = {name: np.ascontiguousarray(arr) for name, arr in arrays.items()}
+    entries = {}
+    # Offsets depend on the header size, so size the header with room to spare
+    header_room = 0
+    while True:
+        offset = _align(PREFIX.size + header_room)
+        for name, arr in arrays.items():
+            entries[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+            offset = _align(offset + arr.nbytes)
+        header = json.dumps({"meta": meta or {}, "arrays": entries}).encode("utf-8")
+        if len(header) <= header_room:
+            break
+        header_room = len(header) + 64
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, arr in arrays.items():
+            f.write(b"\0" * (entries[name]["offset"] - f.tell()))
+            f.write(arr.tobytes())
+    # Atomic replace so a crash never leaves a half-written model behind
+    os.replace(tmp_path, path)
+
+
+def load_arrays(path, memory_map=True):
+    with open(path, "rb") as f:
+        magic, version, header_len = PREFIX.unpack(f.read(PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an RPSM model file")
+        if version > VERSION:
+            raise ValueError(f"{path} has unsupported model format version {version}")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        if memory_map and int(np.prod(shape)) > 0:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=entry["offset"], shape=shape)
+        else:
+            with open(path, "rb") as f:
+                f.seek(entry["offset"])
+                count = int(np.prod(shape))
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return arrays, header["meta"]
+
+
+def read_knn_xml(path):
+    # Pull the training samples back out of a cv2.ml.KNearest XML/YAML file
+    fs = cv2.FileStorage(path, cv2.FILE_STORAGE_READ)
+    try:
+        node = fs.getNode("opencv_ml_knn")
+        if node.empty():
+            raise ValueError(f"{path} is not a KNearest model")
+        samples = node.getNode("samples").mat()
+        responses = node.getNode("responses").mat()
+    finally:
+        fs.release()
+    if samples is None or responses is None:
+        raise ValueError(f"{path} has no stored samples")
+    return samples.astype(np.float32), responses.reshape(-1).astype(np.int32)
+
+
+def convert_xml(xml_path, out_path):
+    features, labels = read_knn_xml(xml_path)
+    save_arrays(out_path, {"features": features, "labels": labels},
+                {"source": os.path.basename(xml_path)})
+    return features, labels
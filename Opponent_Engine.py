@@ -0,0 +1,310 @@
+import numpy as np
+
+import RPSGame
+
+# Computer opponents that predict the player's next move and play its counter.
+#
+# Strategies run a batch of independent games at once (n_games, one row of
+# state per game), so simulate() plays millions of rounds with a few thousand
+# numpy calls (tournament.py runs it across processes); the game itself uses
+# n_games=1. Moves are 0-based here (0=Rock, 1=Paper, 2=Scissor); Opponent
+# converts to the game's 1..3.
+
+
+def counter(moves):
+    # The move that beats each move (Rock -> Paper -> Scissor -> Rock)
+    return (np.asarray(moves) + 1) % 3
+
+
+class Strategy:
+    """Base class: scores() rates the player's possible next moves per game.
+
+    Every method takes an optional `rows` array to act on some games only
+    (default: all), so a SessionManager can keep one strategy with a row
+    per session and play whichever sessions have a move ready. reset()
+    clears rows for reuse and grow() adds rows.
+    """
+
+    name = "base"
+
+    def __init__(self, n_games=1, seed=None):
+        self.n_games = n_games
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(n_games)
+
+    def _rows(self, rows):
+        return self.rows if rows is None else np.asarray(rows)
+
+    @staticmethod
+    def _index(rows):
+        # For plain per-game arrays: a slice (a cheap view) when acting on all games
+        return slice(None) if rows is None else np.asarray(rows)
+
+    def scores(self, rows=None):
+        return np.zeros((len(self._rows(rows)), 3))
+
+    def predict(self, rows=None):
+        # Most likely next player move; ties are broken at random
+        s = self.scores(rows)
+        noise = self.rng.random(s.shape) * 1e-6
+        return np.argmax(s + noise, axis=1)
+
+    def choose(self, rows=None):
+        return counter(self.predict(rows))
+
+    def update(self, moves, rows=None):
+        pass
+
+    def reset(self, rows):
+        pass
+
+    def grow(self, n_games):
+        self.n_games = n_games
+        self.rows = np.arange(n_games)
+
+    def nbytes(self):
+        # Memory held by the per-game state arrays
+        return sum(v.nbytes for v in vars(self).values() if isinstance(v, np.ndarray) and v is not self.rows)
+
+
+def _grow_array(arr, n_games, fill=0):
+    # Copy of a per-game array (games along axis 0) with rows added up to n_games
+    out = np.full((n_games,) + arr.shape[1:], fill, dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+
+class RandomStrategy(Strategy):
+    """Uniform random moves – unexploitable, but never learns."""
+
+    name = "random"
+
+    def choose(self, rows=None):
+        return self.rng.integers(0, 3, len(self._rows(rows)))
+
+
+class MarkovStrategy(Strategy):
+    """Order-N Markov chain: counts of the player's move after each N-move context.
+
+    The table has 3**order rows per game and the context index is rolled
+    forward in O(1), so an update touches one row. With decay < 1 the row
+    is scaled down before counting, so old habits fade. Counts are float32,
+    which halves the per-game state (it matters once there are thousands
+    of sessions).
+    """
+
+    name = "markov"
+
+    def __init__(self, n_games=1, seed=None, order=1, decay=1.0):
+        super().__init__(n_games, seed)
+        self.order = order
+        self.decay = decay
+        self.n_contexts = 3 ** order
+        self.table = np.zeros((n_games, self.n_contexts, 3), dtype=np.float32)
+        self.context = np.zeros(n_games, dtype=np.int64)
+        self.seen = np.zeros(n_games, dtype=np.int64)  # moves observed per game
+        # Games that have not seen `order` moves yet (no full context); once
+        # this is 0 the per-game checks are skipped and `seen` stops counting
+        self.cold = n_games if order else 0
+
+    def scores(self, rows=None):
+        idx, rows = self._index(rows), self._rows(rows)
+        # The table viewed as (games * contexts, 3): one flat index per game
+        s = self.table.reshape(-1, 3)[rows * self.n_contexts + self.context[idx]]
+        if self.cold:
+            s[self.seen[idx] < self.order] = 0
+        return s
+
+    def update(self, moves, rows=None):
+        idx, rows = self._index(rows), self._rows(rows)
+        moves = np.asarray(moves)
+        cells = rows * self.n_contexts + self.context[idx]
+        counted = moves
+        if self.cold:
+            seen = self.seen[idx]
+            ready = seen >= self.order
+            cells, counted = cells[ready], moves[ready]
+            self.seen[idx] = seen + 1
+            self.cold -= int(np.count_nonzero(seen + 1 == self.order))
+        flat = self.table.reshape(-1, 3)
+        if self.decay != 1.0:
+            flat[cells] *= self.decay
+        self.table.reshape(-1)[cells * 3 + counted] += 1
+        self.context[idx] = (self.context[idx] * 3 + moves) % self.n_contexts
+
+    def reset(self, rows):
+        if self.order:
+            self.cold += int(np.count_nonzero(self.seen[rows] >= self.order))
+        self.table[rows] = 0
+        self.context[rows] = 0
+        self.seen[rows] = 0
+
+    def grow(self, n_games):
+        if self.order:
+            self.cold += n_games - self.n_games
+        super().grow(n_games)
+        self.table = _grow_array(self.table, n_games)
+        self.context = _grow_array(self.context, n_games)
+        self.seen = _grow_array(self.seen, n_games)
+
+
+class FrequencyStrategy(MarkovStrategy):
+    """Counters the player's most frequent move (an order-0 Markov chain)."""
+
+    name = "frequency"
+
+    def __init__(self, n_games=1, seed=None, decay=1.0):
+        super().__init__(n_games, seed, order=0, decay=decay)
+
+
+class MixtureStrategy(Strategy):
+    """Mixture of experts over n-gram (Markov) predictors of several orders.
+
+    Every expert predicts each round; its score moves +1 when its counter
+    would have won and -1 when it would have lost (decayed, so the mixture
+    follows a player who changes style). The best-scoring expert picks the
+    move, with ties broken at random.
+    """
+
+    name = "mixture"
+
+    def __init__(self, n_games=1, seed=None, orders=(0, 1, 2, 3), decay=0.9, table_decay=0.95):
+        super().__init__(n_games, seed)
+        self.experts = [MarkovStrategy(n_games, seed, order=o, decay=table_decay) for o in orders]
+        self.expert_scores = np.zeros((n_games, len(self.experts)), dtype=np.float32)
+        # Each expert's last prediction per game, scored by the next update (-1 = none)
+        self.predictions = np.full((n_games, len(self.experts)), -1, dtype=np.int8)
+        self.decay = decay
+
+    def predict(self, rows=None):
+        idx = self._index(rows)
+        predictions = np.stack([expert.predict(rows) for expert in self.experts], axis=1)
+        self.predictions[idx] = predictions
+        noise = self.rng.random(predictions.shape) * 1e-6
+        best = np.argmax(self.expert_scores[idx] + noise, axis=1)
+        return predictions[np.arange(len(predictions)), best]
+
+    def update(self, moves, rows=None):
+        idx = self._index(rows)
+        moves = np.asarray(moves)[:, None]
+        predictions = self.predictions[idx]
+        # Outcome of each expert's counter move against the actual move
+        reward = (predictions == moves).astype(np.float32) - (predictions == counter(moves))
+        self.expert_scores[idx] = self.expert_scores[idx] * self.decay + reward
+        self.predictions[idx] = -1
+        for expert in self.experts:
+            expert.update(moves[:, 0], rows)
+
+    def reset(self, rows):
+        self.expert_scores[rows] = 0
+        self.predictions[rows] = -1
+        for expert in self.experts:
+            expert.reset(rows)
+
+    def grow(self, n_games):
+        super().grow(n_games)
+        self.expert_scores = _grow_array(self.expert_scores, n_games)
+        self.predictions = _grow_array(self.predictions, n_games, -1)
+        for expert in self.experts:
+            expert.grow(n_games)
+
+    def nbytes(self):
+        return super().nbytes() + sum(expert.nbytes() for expert in self.experts)
+
+
+STRATEGIES = {
+    "random": RandomStrategy,
+    "frequency": FrequencyStrategy,
+    "markov": MarkovStrategy,
+    "mixture": MixtureStrategy,
+}
+
+
+def make_strategy(kind="mixture", n_games=1, seed=None, **options):
+    if kind not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{kind}', choose from {sorted(STRATEGIES)}")
+    return STRATEGIES[kind](n_games, seed, **options)
+
+
+class Opponent:
+    """One game's computer player, in the game's 1=Rock 2=Paper 3=Scissor moves."""
+
+    def __init__(self, strategy="mixture", seed=None, **options):
+        self.strategy = make_strategy(strategy, 1, seed, **options)
+
+    @property
+    def name(self):
+        return self.strategy.name
+
+    def choose(self):
+        # Must be called before the player's move is known
+        return int(self.strategy.choose()[0]) + 1
+
+    def observe(self, player_move):
+        if player_move in (1, 2, 3):
+            self.strategy.update(np.array([player_move - 1]))
+
+
+# ----------------------------------------------------------------------
+# Simulation harness
+# ----------------------------------------------------------------------
+# Scripted players: play(rng, round, last_player, last_computer) -> moves,
+# each argument holding one entry per game.
+def _random_player(rng, t, last_p, last_c):
+    return rng.integers(0, 3, len(last_p))
+
+
+def _biased_player(rng, t, last_p, last_c):
+    # Rock half of the time
+    return np.where(rng.random(len(last_p)) < 0.5, 0, rng.integers(0, 3, len(last_p)))
+
+
+def _cycle_player(rng, t, last_p, last_c):
+    return np.full(len(last_p), t % 3)
+
+
+def _sticky_player(rng, t, last_p, last_c):
+    # Repeats the last move 80% of the time
+    return np.where(rng.random(len(last_p)) < 0.8, last_p, rng.integers(0, 3, len(last_p)))
+
+
+def _beat_last_player(rng, t, last_p, last_c):
+    # Plays whatever beats the computer's previous move
+    return counter(last_c)
+
+
+def _win_stay_lose_shift_player(rng, t, last_p, last_c):
+    won = last_p == counter(last_c)
+    return np.where(won, last_p, counter(last_p))
+
+
+PLAYERS = {
+    "random": _random_player,
+    "biased": _biased_player,
+    "cycle": _cycle_player,
+    "sticky": _sticky_player,
+    "beat_last": _beat_last_player,
+    "win_stay_lose_shift": _win_stay_lose_shift_player,
+}
+
+
+def simulate(strategy, player, rounds=1000, games=1000, seed=0, **options):
+    """Play `games` independent games of `rounds` rounds.
+
+    Returns (computer wins, player wins, draws) counts; see tournament.py
+    for the multi-process driver and report.
+    """
+    rng = np.random.default_rng(seed)
+    opponent = make_strategy(strategy, games, seed + 1, **options)
+    play = PLAYERS[player]
+    last_p = rng.integers(0, 3, games)
+    last_c = rng.integers(0, 3, games)
+    totals = np.zeros(3, dtype=np.int64)
+    for t in range(rounds):
+        c = opponent.choose()
+        p = play(rng, t, last_p, last_c)
+        player_wins, computer_wins, draws = RPSGame.tally(p + 1, c + 1)
+        totals += (computer_wins, player_wins, draws)
+        opponent.update(p)
+        last_p, last_c = p, c
+    return totals
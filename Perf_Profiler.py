@@ -0,0 +1,241 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+# Histogram buckets: log-spaced from 10 µs to 10 s (in milliseconds)
+BUCKET_EDGES = np.logspace(-2, 4, 97)
+
+
+class RollingHistogram:
+    """Bucketed latency histogram over the last `window` samples plus all-time totals.
+
+    Percentiles are read from the bucket counts, so they cost O(buckets)
+    no matter how many samples were recorded.
+    """
+
+    def __init__(self, window=300):
+        self.recent = [0] * window
+        self.window = window
+        self.pos = 0
+        self.filled = 0
+        self.counts = np.zeros(len(BUCKET_EDGES) + 1, dtype=np.int64)
+        self.total_counts = np.zeros(len(BUCKET_EDGES) + 1, dtype=np.int64)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        bucket = int(np.searchsorted(BUCKET_EDGES, ms))
+        if self.filled == self.window:
+            self.counts[self.recent[self.pos]] -= 1
+        else:
+            self.filled += 1
+        self.recent[self.pos] = bucket
+        self.pos = (self.pos + 1) % self.window
+        self.counts[bucket] += 1
+        self.total_counts[bucket] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @staticmethod
+    def _percentile(counts, q):
+        n = counts.sum()
+        if n == 0:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(counts), q / 100 * n))
+        # Report the bucket's upper edge
+        return float(BUCKET_EDGES[min(bucket, len(BUCKET_EDGES) - 1)])
+
+    def percentile(self, q, all_time=False):
+        value = self._percentile(self.total_counts if all_time else self.counts, q)
+        return min(value, self.max_ms)
+
+    def summary(self, all_time=False):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50, all_time), 3),
+            "p95_ms": round(self.percentile(95, all_time), 3),
+            "p99_ms": round(self.percentile(99, all_time), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class StartupTimer:
+    """Wall time of each startup step, up to the first frame on screen."""
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.last = self.t0
+        self.steps = {}
+        self.first_frame = None
+
+    def mark(self, name):
+        # Charge everything since the previous mark to `name`
+        now = time.perf_counter()
+        self.steps[name] = self.steps.get(name, 0.0) + now - self.last
+        self.last = now
+
+    @contextmanager
+    def step(self, name):
+        self.mark("other")
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def frame_shown(self):
+        if self.first_frame is None:
+            self.mark("first frame")
+            self.first_frame = time.perf_counter() - self.t0
+
+    def report(self):
+        steps = {name: round(s * 1000, 2) for name, s in self.steps.items() if s > 0.0005}
+        return {
+            "steps_ms": steps,
+            "time_to_first_frame_ms": round(self.first_frame * 1000, 2) if self.first_frame else None,
+        }
+
+
+class StageTimer:
+    """Accumulates wall time per named stage for every frame of the game loop.
+
+    Stages may nest; a stage is charged only its own time, so e.g. "predict"
+    inside "draw" is not counted twice. Per-frame stage times feed rolling
+    histograms (see RollingHistogram) and, optionally, a per-frame CSV log.
+    """
+
+    def __init__(self, window=300, log_path=None):
+        self.window = window
+        self.histograms = {}
+        self.frame_hist = RollingHistogram(window)
+        self.current = {}
+        self.stack = []
+        self.frame_start = None
+        self.run_start = None
+        self.frames = 0
+        self.busy = 0.0
+        self.recent_frame_ends = []
+        self.log_path = log_path
+        self.log_file = None
+        self.log_writer = None
+
+    def start(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def stop(self, name=None):
+        if not self.stack:
+            return
+        stage, t0, child = self.stack.pop()
+        elapsed = time.perf_counter() - t0
+        self.current[stage] = self.current.get(stage, 0.0) + elapsed - child
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    @contextmanager
+    def stage(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        if self.run_start is None:
+            self.run_start = self.frame_start
+        self.current = {}
+        self.stack = []
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        while self.stack:
+            self.stop()
+        now = time.perf_counter()
+        frame_s = now - self.frame_start
+        self.frames += 1
+        self.busy += frame_s
+        self.frame_hist.add(frame_s * 1000)
+        for name, seconds in self.current.items():
+            if name not in self.histograms:
+                self.histograms[name] = RollingHistogram(self.window)
+            self.histograms[name].add(seconds * 1000)
+        self.recent_frame_ends.append(now)
+        if len(self.recent_frame_ends) > 30:
+            del self.recent_frame_ends[0]
+        if self.log_path:
+            self._log_frame(now, frame_s)
+        self.frame_start = None
+
+    def _log_frame(self, now, frame_s):
+        # Long format (one row per stage per frame), so stages that only show
+        # up in some states do not break the column layout
+        if self.log_writer is None:
+            self.log_file = open(self.log_path, "w", newline="")
+            self.log_writer = csv.writer(self.log_file)
+            self.log_writer.writerow(["frame", "t_s", "stage", "ms"])
+        t = round(now - self.run_start, 4)
+        self.log_writer.writerow([self.frames, t, "frame", round(frame_s * 1000, 3)])
+        for name, seconds in self.current.items():
+            self.log_writer.writerow([self.frames, t, name, round(seconds * 1000, 3)])
+
+    def fps(self):
+        # Loop rate over the last 30 frames
+        ends = self.recent_frame_ends
+        if len(ends) < 2 or ends[-1] == ends[0]:
+            return 0.0
+        return (len(ends) - 1) / (ends[-1] - ends[0])
+
+    def report(self, all_time=True):
+        wall = time.perf_counter() - self.run_start if self.run_start else 0.0
+        stages = {}
+        for name, hist in self.histograms.items():
+            stats = hist.summary(all_time)
+            stats["share"] = round(hist.total_ms / 1000 / self.busy, 3) if self.busy else 0.0
+            stages[name] = stats
+        return {
+            "frames": self.frames,
+            "fps": round(self.frames / wall, 2) if wall else 0.0,
+            "frame": self.frame_hist.summary(all_time),
+            "stages": stages,
+        }
+
+    def draw_overlay(self, img, x=10, y=20):
+        # Rolling per-stage p50/p95/p99 in the corner of the frame
+        lines = [f"{'stage':<9}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        for name, hist in [("frame", self.frame_hist)] + sorted(self.histograms.items()):
+            lines.append(f"{name[:8]:<9}{hist.percentile(50):7.2f}{hist.percentile(95):7.2f}{hist.percentile(99):7.2f}")
+        h = 16 * len(lines) + 8
+        w = 300
+        roi = img[y - 14:y - 14 + h, x - 4:x - 4 + w]
+        np.floor_divide(roi, 3, out=roi)
+        for i, line in enumerate(lines):
+            cv2.putText(img, line, (x, y + i * 16), cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 0), 1)
+        return img
+
+    def export(self, path):
+        # Summary as .json, or per-stage rows as .csv
+        report = self.report()
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "share"])
+                writer.writerow(["frame"] + [report["frame"][k] for k in ("count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")] + [1.0])
+                for name, s in report["stages"].items():
+                    writer.writerow([name] + [s[k] for k in ("count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "share")])
+        else:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+        return report
+
+    def close(self):
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+            self.log_writer = None
@@ -0,0 +1,78 @@
+import cv2
+import numpy as np
+import time
+from collections import Counter, deque
+
+
+class PredictionScheduler:
+    """Decides when a frame is worth a full classifier run.
+
+    A tiny grayscale thumbnail of the watched image is compared with the one
+    from the last inference; while nothing moved the previous prediction is
+    reused. Inference never runs more than max_rate times per second, but is
+    refreshed at least every max_interval seconds. The returned label is a
+    majority vote over the last `history` predictions.
+    """
+
+    def __init__(self, predict_fn, change_threshold=6.0, max_rate=10.0, max_interval=1.0,
+                 history=5, thumb_size=(16, 16)):
+        self.predict_fn = predict_fn
+        self.change_threshold = change_threshold
+        self.min_period = 1.0 / max_rate if max_rate else 0.0
+        self.max_interval = max_interval
+        self.thumb_size = thumb_size
+        self.history = deque(maxlen=history)
+        self.last_thumb = None
+        self.last_run = None
+        self.last_change = 0.0
+        self.inferences = 0
+        self.skipped = 0
+
+    def thumbnail(self, img):
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def change_metric(self, thumb):
+        # Mean absolute difference (0-255) against the last inferred thumbnail
+        if self.last_thumb is None:
+            return float("inf")
+        return float(np.abs(thumb - self.last_thumb).mean())
+
+    def update(self, watch_img, *args, now=None):
+        # watch_img drives change detection; args are passed on to predict_fn
+        now = time.monotonic() if now is None else now
+        thumb = self.thumbnail(watch_img)
+        self.last_change = self.change_metric(thumb)
+        since = float("inf") if self.last_run is None else now - self.last_run
+        moved = self.last_change > self.change_threshold
+        if (moved and since >= self.min_period) or since >= self.max_interval:
+            self.history.append(self.predict_fn(*args))
+            self.last_thumb = thumb
+            self.last_run = now
+            self.inferences += 1
+        else:
+            self.skipped += 1
+        return self.smoothed()
+
+    def smoothed(self):
+        if not self.history:
+            return 0
+        counts = Counter(self.history)
+        best = max(counts.values())
+        # Ties go to the most recent of the tied labels
+        for label in reversed(self.history):
+            if counts[label] == best:
+                return label
+
+    def reset(self):
+        self.history.clear()
+        self.last_thumb = None
+        self.last_run = None
+
+    def stats(self):
+        total = self.inferences + self.skipped
+        return {
+            "inferences": self.inferences,
+            "skipped": self.skipped,
+            "skip_ratio": round(self.skipped / total, 3) if total else 0.0,
+        }
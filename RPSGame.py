@@ -1,32 +1,40 @@
 import random
 
-def Game(player_choice, player_score, computer_score):
-    # 1: Rock, 2: Paper, 3: Scissor
-    computer_choice = random.randint(1, 3)
-    status = ""
-    
-    if player_choice == computer_choice:
-        status = "Draw"
-    elif player_choice == 1: # Rock
-        if computer_choice == 2: # Paper
-            status = "Computer Wins"
-            computer_score += 1
-        else: # Scissor
-            status = "Player Wins"
-            player_score += 1
-    elif player_choice == 2: # Paper
-        if computer_choice == 1: # Rock
-            status = "Player Wins"
-            player_score += 1
-        else: # Scissor
-            status = "Computer Wins"
-            computer_score += 1
-    elif player_choice == 3: # Scissor
-        if computer_choice == 1: # Rock
-            status = "Computer Wins"
-            computer_score += 1
-        else: # Paper
-            status = "Player Wins"
-            player_score += 1
-            
-    return status, player_score, computer_score, computer_choice
\ No newline at end of file
+import numpy as np
+
+# PAYOFF[player_choice, computer_choice] from the player's side:
+# 1 = player wins, -1 = computer wins, 0 = draw. Index 0 means "no move".
+PAYOFF = np.array([
+    [0, 0, 0, 0],
+    [0, 0, -1, 1],  # Rock: loses to Paper, beats Scissor
+    [0, 1, 0, -1],  # Paper: beats Rock, loses to Scissor
+    [0, -1, 1, 0],  # Scissor: loses to Rock, beats Paper
+], dtype=np.int8)
+STATUS = {1: "Player Wins", -1: "Computer Wins", 0: "Draw"}
+
+
+def outcomes(player_choices, computer_choices):
+    # Vectorized round results for arrays of choices (1..3)
+    return PAYOFF[np.asarray(player_choices), np.asarray(computer_choices)]
+
+
+def tally(player_choices, computer_choices):
+    # (player wins, computer wins, draws) over arrays of choices
+    counts = np.bincount(outcomes(player_choices, computer_choices).ravel() + 1, minlength=3)
+    return int(counts[2]), int(counts[0]), int(counts[1])
+
+
+def Game(player_choice, player_score, computer_score, computer_choice=None):
+    # 1: Rock, 2: Paper, 3: Scissor. computer_choice comes from the opponent
+    # engine (see Opponent_Engine); without one the computer plays at random.
+    if computer_choice is None:
+        computer_choice = random.randint(1, 3)
+    if player_choice not in (1, 2, 3):
+        return "", player_score, computer_score, computer_choice
+
+    result = int(PAYOFF[player_choice, computer_choice])
+    if result == 1:
+        player_score += 1
+    elif result == -1:
+        computer_score += 1
+    return STATUS[result], player_score, computer_score, computer_choice
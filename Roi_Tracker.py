@@ -0,0 +1,177 @@
+import time
+from contextlib import nullcontext
+
+import cv2
+import numpy as np
+
+
+class RoiTracker:
+    """Moves the classifier ROI with the player's hand.
+
+    The hand detector (MediaPipe) runs only every detect_every frames, on
+    the frame downscaled by detect_scale; landmarks come back normalised, so
+    the box is still in full-frame pixels. In between, the hand box is
+    followed by template matching on FrameContext.small, searching only
+    around its last position. When the match gets weak the hand counts as
+    lost and the next frame runs detection again. After max_missing failed
+    detections the ROI goes back to the fixed default box.
+
+    update() returns the square ROI (x, y, size) for the frame, grown by
+    margin around the hand, smoothed and rounded to size_step pixels so the
+    ROI buffers of the FrameContext are not reallocated every frame.
+    """
+
+    def __init__(self, detector, default_roi=(50, 100, 250), detect_every=5, detect_scale=0.5, margin=0.25,
+                 min_size=96, size_step=16, smoothing=0.5, search=0.5, min_score=0.5, max_missing=3):
+        self.detector = detector
+        self.default_roi = default_roi
+        self.detect_every = max(1, detect_every)
+        self.detect_scale = detect_scale
+        self.margin = margin
+        self.min_size = min_size
+        self.size_step = size_step
+        self.smoothing = smoothing
+        self.search = search
+        self.min_score = min_score
+        self.max_missing = max_missing
+
+        self.box = None  # hand box (x, y, w, h) in frame pixels, None when no hand
+        self.template = None  # the hand as seen on the small gray frame at the last detection
+        self.roi = default_roi
+        self.center = None  # smoothed ROI centre and size
+        self.side = None
+        self.until_detect = 0
+        self.missing = 0
+        self.frames = 0
+        self.detections = 0
+        self.found = 0
+        self.tracked = 0
+        self.lost = 0
+        self.detect_s = 0.0
+
+    def reset(self):
+        self.box = self.template = self.center = self.side = None
+        self.roi = self.default_roi
+        self.until_detect = 0
+        self.missing = 0
+
+    # -- detection ---------------------------------------------------------
+    def detect(self, frame):
+        # Full hand detection on the downscaled frame; returns a box or None
+        t0 = time.perf_counter()
+        self.detector.findHands(frame.frame, draw=False, rgb=frame.rgb_scaled(self.detect_scale))
+        hands = self.detector.findAllPositions(frame.frame)
+        self.detections += 1
+        self.detect_s += time.perf_counter() - t0
+        if not hands:
+            return None
+        if self.center is not None:
+            # Stay with the hand nearest the ROI (a second hand must not steal it)
+            cx, cy = self.center
+            hand = min(hands, key=lambda h: (h["center"][0] - cx) ** 2 + (h["center"][1] - cy) ** 2)
+        else:
+            hand = max(hands, key=lambda h: h["bbox"][2] * h["bbox"][3])
+        self.found += 1
+        return hand["bbox"]
+
+    def _small_box(self, frame, box):
+        # Frame box -> (x0, y0, x1, y1) on the small gray frame, clipped
+        small = frame.small
+        sx = small.shape[1] / frame.frame.shape[1]
+        sy = small.shape[0] / frame.frame.shape[0]
+        x, y, w, h = box
+        x0, y0 = max(0, int(x * sx)), max(0, int(y * sy))
+        x1, y1 = min(small.shape[1], int((x + w) * sx) + 1), min(small.shape[0], int((y + h) * sy) + 1)
+        return x0, y0, x1, y1, sx, sy
+
+    def _remember(self, frame, box):
+        x0, y0, x1, y1, _, _ = self._small_box(frame, box)
+        self.box = box
+        # Too small to match reliably: detect again on the next frame instead
+        self.template = frame.small[y0:y1, x0:x1].copy() if x1 - x0 >= 4 and y1 - y0 >= 4 else None
+
+    # -- tracking ----------------------------------------------------------
+    def track(self, frame):
+        # Template match around the last position; returns the moved box or None
+        if self.template is None:
+            return None
+        x0, y0, x1, y1, sx, sy = self._small_box(frame, self.box)
+        th, tw = self.template.shape
+        pad_x, pad_y = int(tw * self.search) + 1, int(th * self.search) + 1
+        small = frame.small
+        sx0, sy0 = max(0, x0 - pad_x), max(0, y0 - pad_y)
+        sx1, sy1 = min(small.shape[1], x0 + tw + pad_x), min(small.shape[0], y0 + th + pad_y)
+        region = small[sy0:sy1, sx0:sx1]
+        if region.shape[0] < th or region.shape[1] < tw:
+            return None
+        scores = cv2.matchTemplate(region, self.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (mx, my) = cv2.minMaxLoc(scores)
+        if score < self.min_score:
+            return None
+        dx, dy = (sx0 + mx - x0) / sx, (sy0 + my - y0) / sy
+        x, y, w, h = self.box
+        return int(round(x + dx)), int(round(y + dy)), w, h
+
+    # -- ROI ---------------------------------------------------------------
+    def _place(self, frame, box):
+        # Square ROI around the hand box, smoothed, rounded and kept inside the frame
+        fh, fw = frame.frame.shape[:2]
+        x, y, w, h = box
+        center = (x + w / 2, y + h / 2)
+        side = max(w, h) * (1 + 2 * self.margin)
+        if self.center is not None:
+            a = self.smoothing
+            center = (a * self.center[0] + (1 - a) * center[0], a * self.center[1] + (1 - a) * center[1])
+            side = a * self.side + (1 - a) * side
+        self.center, self.side = center, side
+        step = self.size_step
+        size = int(min(max(self.min_size, round(side / step) * step), fw, fh))
+        rx = int(np.clip(center[0] - size / 2, 0, fw - size))
+        ry = int(np.clip(center[1] - size / 2, 0, fh - size))
+        return rx, ry, size
+
+    def update(self, frame, timer=None):
+        """ROI (x, y, size) for this frame. frame: the FrameContext after begin()."""
+        stage = timer.stage if timer is not None else lambda name: nullcontext()
+        self.frames += 1
+        if self.until_detect > 0:
+            self.until_detect -= 1
+            if self.box is None:
+                # No hand to follow: wait for the next detection
+                return self.roi
+            with stage("track"):
+                box = self.track(frame)
+            if box is None:
+                # Lost it: detect on the next frame rather than wait out the interval
+                self.lost += 1
+                self.until_detect = 0
+                return self.roi
+            self.tracked += 1
+        else:
+            with stage("detect"):
+                box = self.detect(frame)
+            self.until_detect = self.detect_every - 1
+            if box is None:
+                self.missing += 1
+                if self.missing >= self.max_missing:
+                    # No hand for a while: back to the fixed box
+                    self.box = self.template = self.center = self.side = None
+                    self.roi = self.default_roi
+                return self.roi
+            self.missing = 0
+            self._remember(frame, box)
+        self.box = box
+        self.roi = self._place(frame, box)
+        return self.roi
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "detect_ratio": round(self.detections / self.frames, 3) if self.frames else 0.0,
+            "hands_found": self.found,
+            "tracked": self.tracked,
+            "lost": self.lost,
+            "detect_ms_mean": round(self.detect_s * 1000 / self.detections, 3) if self.detections else 0.0,
+            "roi": list(self.roi),
+        }
@@ -0,0 +1,127 @@
+import numpy as np
+
+import Feature_Index
+
+
+class SampleStore:
+    """Growable (features, labels) matrix for online training.
+
+    Rows live in one preallocated buffer whose capacity doubles when full,
+    so append() is O(1) amortized. The buffer takes the dtype of the first
+    rows added: float32, or the 1-byte codes of a quantizing pipeline. With
+    per_class set, each label keeps at most that many rows: once a class is
+    full, a new sample replaces a random row of the same class with
+    probability per_class / seen (reservoir sampling), so the kept rows stay
+    a uniform sample of everything seen.
+    """
+
+    def __init__(self, dim=0, per_class=None, capacity=256, seed=None):
+        self.dim = dim
+        self.per_class = per_class
+        self.buffer = np.empty((capacity, dim), dtype=np.float32)
+        self.label_buffer = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+        self.rows = {}  # label -> row numbers holding that label
+        self.seen = {}  # label -> samples offered, kept or not
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def features(self):
+        return self.buffer[:self.size]
+
+    @property
+    def labels(self):
+        return self.label_buffer[:self.size]
+
+    def count(self, label=None):
+        if label is None:
+            return self.size
+        return len(self.rows.get(label, ()))
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self.buffer), 16)
+        buffer = np.empty((capacity, self.dim), dtype=self.buffer.dtype)
+        label_buffer = np.empty(capacity, dtype=np.int32)
+        buffer[:self.size] = self.buffer[:self.size]
+        label_buffer[:self.size] = self.label_buffer[:self.size]
+        self.buffer, self.label_buffer = buffer, label_buffer
+
+    def append(self, features, label):
+        """Offer one sample; returns (row, replaced) or (None, False) if it was not kept."""
+        features = Feature_Index.as_rows(features).reshape(-1)
+        label = int(label)
+        if self.size == 0 and (self.dim != len(features) or self.buffer.dtype != features.dtype):
+            self.dim = len(features)
+            self.buffer = np.empty((len(self.buffer), self.dim), dtype=features.dtype)
+        seen = self.seen.get(label, 0) + 1
+        self.seen[label] = seen
+        rows = self.rows.setdefault(label, [])
+
+        if self.per_class and len(rows) >= self.per_class:
+            if self.rng.integers(seen) >= self.per_class:
+                return None, False
+            row = rows[int(self.rng.integers(len(rows)))]
+            self.buffer[row] = features
+            return row, True
+
+        if self.size == len(self.buffer):
+            self._grow(self.size + 1)
+        row = self.size
+        self.buffer[row] = features
+        self.label_buffer[row] = label
+        rows.append(row)
+        self.size += 1
+        return row, False
+
+    def extend(self, features, labels):
+        # Bulk append; with per_class set every row goes through the reservoir
+        features = Feature_Index.as_rows(features)
+        labels = np.asarray(labels, dtype=np.int32)
+        if self.per_class:
+            for vec, label in zip(features, labels):
+                self.append(vec, label)
+            return
+        start = self.size
+        if start == 0:
+            # Adopt the first block as-is (e.g. a read-only memmap); the next
+            # append() finds it full and copies it into a growable buffer
+            self.dim = features.shape[1]
+            self.buffer, self.label_buffer = features, labels
+        else:
+            if start + len(labels) > len(self.buffer):
+                self._grow(start + len(labels))
+            self.buffer[start:start + len(labels)] = features
+            self.label_buffer[start:start + len(labels)] = labels
+        for offset, label in enumerate(labels.tolist()):
+            self.rows.setdefault(label, []).append(start + offset)
+            self.seen[label] = self.seen.get(label, 0) + 1
+        self.size += len(labels)
+
+    def detach(self):
+        # Copy adopted rows (e.g. a memmap from extend()) into buffers of our own
+        self.buffer, self.label_buffer = np.array(self.features), np.array(self.labels)
+
+    def replace_all(self, features, labels):
+        # Swap in transformed rows (e.g. after fitting PCA), keeping the reservoir state
+        seen = dict(self.seen)
+        self.size = 0
+        self.rows = {}
+        features = Feature_Index.as_rows(features)
+        self.dim = features.shape[1]
+        self.buffer = np.empty((0, self.dim), dtype=features.dtype)
+        self.label_buffer = np.empty(0, dtype=np.int32)
+        per_class, self.per_class = self.per_class, None
+        self.extend(features, labels)
+        self.per_class = per_class
+        self.seen = seen
+
+    def meta(self):
+        return {"seen": {str(label): n for label, n in self.seen.items()}, "per_class": self.per_class}
+
+    def restore_seen(self, meta):
+        # Reservoir odds continue from the counts saved with the model
+        for label, n in (meta or {}).get("seen", {}).items():
+            self.seen[int(label)] = max(int(n), self.count(int(label)))
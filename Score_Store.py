@@ -0,0 +1,154 @@
+import heapq
+import json
+import os
+import threading
+import time
+
+# Score persistence: every round is appended as one line to scores.jsonl (the
+# full history) and a small summary (totals, high score, top-N leaderboard)
+# is kept in scores.json. The summary records how far into the log it is, so
+# loading only replays rounds appended after the last snapshot.
+
+
+def empty_scores():
+    return {"high_score": 0, "total_wins": 0, "total_losses": 0, "leaderboard": []}
+
+
+def atomic_write_json(path, data):
+    # Write to a temp file and rename over the target, so a crash mid-write
+    # never leaves a truncated scores.json behind
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ScoreStore:
+    """Round results with buffered, background persistence.
+
+    record_round() only updates memory and queues a log line; a background
+    thread appends queued lines to the log and rewrites the (small) summary
+    every flush_interval seconds, and close() flushes whatever is left. The
+    leaderboard is a min-heap of the top_n (score, time) pairs, so recording
+    a round costs O(log top_n) whatever the history length. score_file=None
+    keeps scores in memory only.
+    """
+
+    def __init__(self, score_file=None, top_n=5, flush_interval=2.0):
+        self.score_file = score_file
+        self.log_file = os.path.splitext(score_file)[0] + ".jsonl" if score_file else None
+        self.top_n = top_n
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pending = []
+        self.dirty = False
+        self.data = empty_scores()
+        self.heap = []
+        self.log_offset = 0
+        self.load()
+
+        self.stop_event = threading.Event()
+        self.thread = None
+        if self.score_file:
+            self.thread = threading.Thread(target=self._run, name="ScoreFlush", daemon=True)
+            self.thread.start()
+
+    # -- loading -------------------------------------------------------------
+    def load(self):
+        if not self.score_file:
+            return
+        if os.path.exists(self.score_file):
+            try:
+                with open(self.score_file, "r") as f:
+                    self.data.update(json.load(f))
+            except Exception as e:
+                print("[RPS] Failed to load scores:", e)
+        self.log_offset = self.data.pop("log_offset", 0)
+        for entry in self.data.get("leaderboard", []):
+            self._push_leader(entry["score"], entry["time"])
+        # Rounds appended after the last snapshot (e.g. the game was killed)
+        if self.log_file and os.path.exists(self.log_file):
+            try:
+                with open(self.log_file, "rb") as f:
+                    f.seek(self.log_offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break # torn final line from a crash
+                        self._apply(json.loads(line))
+                        self.log_offset += len(line)
+                if os.path.getsize(self.log_file) > self.log_offset:
+                    with open(self.log_file, "r+b") as f:
+                        f.truncate(self.log_offset)
+            except Exception as e:
+                print("[RPS] Failed to replay score log:", e)
+        self._update_leaderboard()
+
+    # -- recording -------------------------------------------------------------
+    def _push_leader(self, score, when):
+        if len(self.heap) < self.top_n:
+            heapq.heappush(self.heap, (score, when))
+        elif (score, when) > self.heap[0]:
+            heapq.heapreplace(self.heap, (score, when))
+
+    def _update_leaderboard(self):
+        top = sorted(self.heap, key=lambda x: (-x[0], -x[1]))
+        self.data["leaderboard"] = [{"score": s, "time": t} for s, t in top]
+
+    def _apply(self, entry):
+        data = self.data
+        data["player_score"] = entry["player_score"]
+        data["computer_score"] = entry["computer_score"]
+        if entry["result"] == "win":
+            data["total_wins"] = data.get("total_wins", 0) + 1
+        elif entry["result"] == "lose":
+            data["total_losses"] = data.get("total_losses", 0) + 1
+        data["high_score"] = max(data.get("high_score", 0), entry["player_score"])
+        self._push_leader(entry["player_score"], entry["time"])
+        self.dirty = True
+
+    def record_round(self, result, player_score, computer_score, when=None):
+        # result: "win", "lose" or "draw" (from the player's side)
+        entry = {
+            "time": time.time() if when is None else when,
+            "result": result,
+            "player_score": player_score,
+            "computer_score": computer_score,
+        }
+        with self.lock:
+            self._apply(entry)
+            self._update_leaderboard()
+            if self.log_file:
+                self.pending.append(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    # -- persistence -------------------------------------------------------------
+    def flush(self):
+        if not self.score_file:
+            return
+        with self.lock:
+            lines, self.pending = self.pending, []
+            dirty, self.dirty = self.dirty, False
+            snapshot = dict(self.data, leaderboard=list(self.data["leaderboard"]))
+        if not lines and not dirty:
+            return
+        try:
+            if lines:
+                with open(self.log_file, "ab") as f:
+                    f.write("".join(lines).encode("utf-8"))
+                    self.log_offset = f.tell()
+            snapshot["log_offset"] = self.log_offset
+            atomic_write_json(self.score_file, snapshot)
+        except Exception as e:
+            print("[RPS] Failed to save scores:", e)
+
+    def _run(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        self.flush()
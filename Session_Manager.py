@@ -0,0 +1,192 @@
+import sys
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+import Opponent_Engine
+import RPSGame
+
+
+class Session:
+    """One player's game. __slots__ keeps it to a few hundred bytes."""
+
+    __slots__ = ("sid", "row", "player_score", "computer_score", "rounds", "last_seen")
+
+    def __init__(self, sid, row, now):
+        self.sid = sid
+        self.row = row  # this session's row in the shared opponent strategy
+        self.player_score = 0
+        self.computer_score = 0
+        self.rounds = 0
+        self.last_seen = now
+
+    def to_dict(self):
+        return {"session": self.sid, "player": self.player_score, "computer": self.computer_score,
+                "rounds": self.rounds}
+
+
+class SessionManager:
+    """Many independent games in one process.
+
+    The classifiers are shared and only read (every session classifies with
+    the same model). Opponent state is array-backed: one batched
+    Opponent_Engine strategy holds a row per session, so play_many() picks
+    the computer moves for a whole batch of sessions in one call. Rows of
+    closed or evicted sessions are reset and reused, and the strategy grows
+    by doubling when it runs out. Sessions are kept in least-recently-used
+    order, so evict_idle() only looks at the sessions it removes, and with
+    max_sessions set, opening one more session closes the oldest (clients
+    choose session ids, so this bounds memory whatever they send).
+
+    Not thread-safe: the server calls it from its single batch thread.
+    """
+
+    def __init__(self, strategy="mixture", idle_timeout=600.0, capacity=64, seed=None, clock=time.monotonic,
+                 max_sessions=None, **options):
+        self.strategy_name = strategy
+        self.opponents = Opponent_Engine.make_strategy(strategy, capacity, seed, **options)
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self.sessions = OrderedDict()  # sid -> Session, least recently used first
+        self.free_rows = []
+        self.next_row = 0
+        self.rounds = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, sid):
+        return sid in self.sessions
+
+    def open(self, sid=None, now=None):
+        sid = sid or uuid.uuid4().hex
+        if sid in self.sessions:
+            return self.touch(sid, now)
+        if self.max_sessions and len(self.sessions) >= self.max_sessions:
+            # Full: the least recently used session makes room
+            self._release([self.sessions.popitem(last=False)[1].row])
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = self.next_row
+            self.next_row += 1
+            if row >= self.opponents.n_games:
+                self.opponents.grow(self.opponents.n_games * 2)
+        session = Session(sid, row, self.clock() if now is None else now)
+        self.sessions[sid] = session
+        return session
+
+    def touch(self, sid, now=None):
+        session = self.sessions[sid]
+        session.last_seen = self.clock() if now is None else now
+        self.sessions.move_to_end(sid)
+        return session
+
+    def get(self, sid, now=None):
+        # The session for sid, opened on first use
+        if sid in self.sessions:
+            return self.touch(sid, now)
+        return self.open(sid, now)
+
+    def close(self, sid):
+        session = self.sessions.pop(sid, None)
+        if session is not None:
+            self.opponents.reset(np.array([session.row]))
+            self.free_rows.append(session.row)
+        return session
+
+    def evict_idle(self, now=None):
+        # Close sessions not seen for idle_timeout seconds; returns how many
+        now = self.clock() if now is None else now
+        idle = []
+        for sid, session in self.sessions.items():
+            if now - session.last_seen < self.idle_timeout:
+                break
+            idle.append(sid)
+        if idle:
+            self._release([self.sessions.pop(sid).row for sid in idle])
+        return len(idle)
+
+    def _release(self, rows):
+        # Opponent rows of evicted sessions, reset for reuse
+        self.opponents.reset(np.array(rows))
+        self.free_rows.extend(rows)
+        self.evicted += len(rows)
+
+    def play_many(self, sids, moves, now=None):
+        """Play one round for each (session, player move 1..3) pair.
+
+        Returns one dict per pair: status, result ("player" / "computer" /
+        "draw", None for an invalid move), computer move and scores. A
+        session listed twice plays its rounds in order.
+        """
+        results = [None] * len(sids)
+        pending = list(range(len(sids)))
+        while pending:
+            # Each pass plays every session at most once, and no more sessions
+            # than max_sessions, so opening one never evicts another of the pass
+            seen, batch, later = set(), [], []
+            limit = self.max_sessions or len(pending)
+            for i in pending:
+                if sids[i] in seen or len(batch) >= limit:
+                    later.append(i)
+                else:
+                    batch.append(i)
+                    seen.add(sids[i])
+            self._play(batch, sids, moves, results, now)
+            pending = later
+        return results
+
+    def _play(self, batch, sids, moves, results, now):
+        sessions = [self.get(sids[i], now) for i in batch]
+        player = np.array([moves[i] for i in batch], dtype=np.int64)
+        valid = np.isin(player, (1, 2, 3))
+        for i, session in zip(batch, sessions):
+            results[i] = {"status": "No hand detected", "result": None, "scores": session.to_dict()}
+        if not valid.any():
+            return
+        rows = np.array([s.row for s in sessions])[valid]
+        # The computer commits to its moves before looking at the player's
+        computer = self.opponents.choose(rows) + 1
+        outcome = RPSGame.outcomes(player[valid], computer)
+        self.opponents.update(player[valid] - 1, rows)
+        self.rounds += len(rows)
+        played = [(i, s) for i, s, ok in zip(batch, sessions, valid) if ok]
+        for (i, session), c, result in zip(played, computer.tolist(), outcome.tolist()):
+            session.rounds += 1
+            if result == 1:
+                session.player_score += 1
+            elif result == -1:
+                session.computer_score += 1
+            results[i] = {
+                "status": RPSGame.STATUS[result],
+                "result": {1: "player", -1: "computer", 0: "draw"}[result],
+                "computer": c,
+                "scores": session.to_dict(),
+            }
+
+    def play(self, sid, move, now=None):
+        return self.play_many([sid], [move], now)[0]
+
+    def memory(self):
+        # Approximate bytes per live session: the Session object plus its
+        # share of the opponent arrays (allocated capacity, not just used rows)
+        n = max(len(self.sessions), 1)
+        sample = next(iter(self.sessions.values()), None)
+        per_object = sys.getsizeof(sample) + sys.getsizeof(sample.sid) if sample else 0
+        opponent = self.opponents.nbytes()
+        return {
+            "opponent_bytes": opponent,
+            "capacity": self.opponents.n_games,
+            "bytes_per_session": round(per_object + opponent / n),
+        }
+
+    def stats(self):
+        stats = {"sessions": len(self.sessions), "max_sessions": self.max_sessions, "rounds": self.rounds,
+                 "evicted": self.evicted, "strategy": self.strategy_name}
+        stats.update(self.memory())
+        return stats
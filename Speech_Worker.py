@@ -0,0 +1,137 @@
+import importlib.util
+import queue
+import threading
+import time
+
+# pyttsx3 is only imported by the worker thread when the first cue is queued;
+# if it is not installed voice cues are silently skipped.
+HAS_PYTTSX3 = importlib.util.find_spec("pyttsx3") is not None
+
+
+class SpeechWorker:
+    """Speaks voice cues on a background thread and plays sound cues.
+
+    say() only enqueues, so the video loop never waits on runAndWait().
+    Sounds are played right away on the caller's thread (Sound.play() does
+    not block), so they never wait behind an utterance. Repeating the same
+    cue within dedup_window seconds is ignored, and cancel() drops everything
+    still queued and stops the utterance being spoken at its next word (e.g.
+    when the game state moves on).
+    """
+
+    def __init__(self, enabled=True, dedup_window=1.5, max_queue=8):
+        self.enabled = enabled and HAS_PYTTSX3
+        if enabled and not HAS_PYTTSX3:
+            print("[RPS] Warning: pyttsx3 not available – voice cues disabled")
+        self.dedup_window = dedup_window
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.last_queued = {}
+        self.generation = 0
+        self.engine = None
+        self.speaking = None  # generation of the utterance being spoken
+        self.thread = None
+        self.lock = threading.Lock()
+        self.spoken = 0
+        self.played = 0
+        self.skipped = 0
+
+    def _ensure_started(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="SpeechWorker", daemon=True)
+            self.thread.start()
+
+    def _fresh(self, key, window):
+        # False if the same cue was issued within the dedup window
+        now = time.monotonic()
+        if window is None:
+            window = self.dedup_window
+        with self.lock:
+            last = self.last_queued.get(key)
+            if last is not None and now - last < window:
+                return False
+            self.last_queued[key] = now
+        return True
+
+    def _enqueue(self, kind, payload, key, window):
+        if not self._fresh(key, window):
+            return False
+        generation = self.generation
+        self._ensure_started()
+        try:
+            self.queue.put_nowait((generation, kind, payload))
+        except queue.Full:
+            self.skipped += 1
+            return False
+        return True
+
+    def say(self, text, key=None, window=None):
+        if not self.enabled:
+            return False
+        return self._enqueue("say", text, key or text, window)
+
+    def play(self, sound, key=None, window=None):
+        # Any object with a play() method, e.g. a pygame.mixer.Sound
+        if sound is None or not self._fresh(key or id(sound), window):
+            return False
+        try:
+            sound.play()
+            self.played += 1
+        except Exception as e:
+            print("[RPS] Warning: audio cue failed:", e)
+            return False
+        return True
+
+    def cancel(self):
+        with self.lock:
+            self.generation += 1
+        while True:
+            try:
+                self.queue.get_nowait()
+                self.skipped += 1
+            except queue.Empty:
+                break
+
+    def _run(self):
+        if self.enabled:
+            # pyttsx3 engines are tied to the thread that created them
+            try:
+                import pyttsx3
+                self.engine = pyttsx3.init()
+                # Fired on this thread while runAndWait() speaks, so cancel() only
+                # bumps the generation and the stop happens here
+                self.engine.connect("started-word", self._on_word)
+            except Exception as e:
+                print("[RPS] Warning: failed to start TTS engine:", e)
+                self.enabled = False
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            generation, kind, payload = item
+            if generation != self.generation:
+                self.skipped += 1
+                continue
+            try:
+                if kind == "say" and self.engine is not None:
+                    self.speaking = generation
+                    self.engine.say(payload)
+                    self.engine.runAndWait()
+                    self.speaking = None
+                    self.spoken += 1
+            except Exception as e:
+                print("[RPS] Warning: audio cue failed:", e)
+
+    def _on_word(self, name, location, length):
+        # Cancelled mid-utterance: stop from the engine's own thread
+        if self.speaking is not None and self.speaking != self.generation:
+            self.engine.stop()
+
+    def close(self):
+        if self.thread is not None:
+            self.cancel()
+            try:
+                self.queue.put_nowait(None)
+            except queue.Full:
+                pass
+            self.thread.join(timeout=1.0)
+            self.thread = None
@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import platform
+import time
+
+import cv2
+import numpy as np
+
+import Dataset_Stream
+import Feature_Pipeline
+import Hand_Classifier
+import train_model
+
+# Headless accuracy / latency benchmark for HandClassifier.
+#   python benchmark_model.py --dataset <dir> --folds 5 --output results.json
+# The dataset directory needs rock/, paper/ and scissors/ sub-directories.
+
+CLASS_NAMES = {label: name for name, label in train_model.CLASSES.items()}
+
+
+def make_pipeline(args, quantize=None):
+    return Feature_Pipeline.FeaturePipeline(
+        img_size=(args.img_size, args.img_size),
+        normalize=args.normalize,
+        hog=args.hog,
+        pca_components=args.pca or None,
+        quantize=args.quantize if quantize is None else quantize,
+    )
+
+
+def make_classifier(args, quantize=None):
+    return Hand_Classifier.HandClassifier(model_path=None, index=args.index, k=args.k,
+                                          pipeline=make_pipeline(args, quantize))
+
+
+def fit_and_score(classifier, features, labels, train_idx, test_idx):
+    # Train on one split; returns (predictions, train seconds, batch predict seconds)
+    t0 = time.perf_counter()
+    classifier.add_features(features[train_idx], labels[train_idx])
+    classifier.train()
+    train_time = time.perf_counter() - t0
+
+    test_features = classifier.pipeline.encode(features[test_idx])
+    t0 = time.perf_counter()
+    pred = classifier.predict_features(test_features)
+    return pred, train_time, time.perf_counter() - t0
+
+
+def split_indices(labels, test_size, seed):
+    # Stratified single split
+    rng = np.random.default_rng(seed)
+    train, test = [], []
+    for label in np.unique(labels):
+        idx = rng.permutation(np.flatnonzero(labels == label))
+        n_test = max(1, int(round(len(idx) * test_size)))
+        test.extend(idx[:n_test])
+        train.extend(idx[n_test:])
+    return [(np.array(train), np.array(test))]
+
+
+def kfold_indices(labels, folds, seed):
+    # Stratified k-fold: each class is dealt round-robin into the folds
+    rng = np.random.default_rng(seed)
+    fold_of = np.empty(len(labels), dtype=np.int64)
+    for label in np.unique(labels):
+        idx = rng.permutation(np.flatnonzero(labels == label))
+        fold_of[idx] = np.arange(len(idx)) % folds
+    return [(np.flatnonzero(fold_of != f), np.flatnonzero(fold_of == f)) for f in range(folds)]
+
+
+def confusion_matrix(truth, pred, classes):
+    # Rows: true class, columns: predicted class (0 = unknown)
+    cols = [0] + list(classes)
+    matrix = np.zeros((len(classes), len(cols)), dtype=np.int64)
+    for t, p in zip(truth, pred):
+        matrix[classes.index(t), cols.index(p) if p in cols else 0] += 1
+    return matrix, cols
+
+
+def class_report(matrix, cols, classes):
+    report = {}
+    for i, label in enumerate(classes):
+        j = cols.index(label)
+        tp = matrix[i, j]
+        predicted = matrix[:, j].sum()
+        actual = matrix[i].sum()
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / actual if actual else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        report[CLASS_NAMES.get(label, str(label))] = {
+            "precision": round(float(precision), 4),
+            "recall": round(float(recall), 4),
+            "f1": round(float(f1), 4),
+            "support": int(actual),
+        }
+    return report
+
+
+def percentiles(seconds):
+    ms = np.array(seconds) * 1000
+    return {
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+    }
+
+
+def measure_latency(classifier, paths, repeats):
+    # Per-call latency of process_image and predict on decoded test images
+    images = [img for img in (cv2.imread(p) for p in paths) if img is not None]
+    process_times, predict_times = [], []
+    for _ in range(repeats):
+        for img in images:
+            t0 = time.perf_counter()
+            classifier.process_image(img)
+            t1 = time.perf_counter()
+            classifier.predict(img)
+            t2 = time.perf_counter()
+            process_times.append(t1 - t0)
+            predict_times.append(t2 - t1)
+    if not images:
+        return {}
+    return {
+        "process_image": percentiles(process_times),
+        "predict": percentiles(predict_times),
+        "predict_per_sec": round(len(predict_times) / sum(predict_times), 1),
+    }
+
+
+def extract_features(items, pipeline, workers=None):
+    # Raw features for every readable image, through the same streaming path as
+    # train_model.py. The folds index rows at random, so the chunks are copied
+    # into one matrix. Each item's position is streamed as its label, so rows
+    # map back to items (and their paths) even when an image cannot be read.
+    features = np.empty((len(items), pipeline.raw_dim), dtype=np.float32)
+    rows = np.empty(len(items), dtype=np.int64)
+    n = 0
+    numbered = ((path, i) for i, (path, _) in enumerate(items))
+    for chunk, ids, _ in Dataset_Stream.stream_features(numbered, pipeline, workers=workers):
+        features[n:n + len(ids)] = chunk
+        rows[n:n + len(ids)] = ids
+        n += len(ids)
+    return features[:n], rows[:n]
+
+
+def run_benchmark(args):
+    items = train_model.list_dataset(args.dataset)
+    if args.limit:
+        rng = np.random.default_rng(args.seed)
+        items = [items[i] for i in sorted(rng.choice(len(items), min(args.limit, len(items)), replace=False))]
+    if not items:
+        raise SystemExit("No images found – check --dataset")
+
+    # Raw features are extracted once and reused by every fold
+    t0 = time.perf_counter()
+    features, rows = extract_features(items, make_pipeline(args), args.workers)
+    extract_time = time.perf_counter() - t0
+    labels = np.array([label for _, label in items], dtype=np.int32)[rows]
+    paths = [items[i][0] for i in rows]
+    classes = sorted(int(c) for c in np.unique(labels))
+    print(f"Extracted {len(labels)} images in {extract_time:.2f}s")
+
+    if args.folds > 1:
+        splits = kfold_indices(labels, args.folds, args.seed)
+    else:
+        splits = split_indices(labels, args.test_size, args.seed)
+
+    total = np.zeros((len(classes), len(classes) + 1), dtype=np.int64)
+    fold_results = []
+    latency = {}
+    baseline = []
+    for f, (train_idx, test_idx) in enumerate(splits):
+        classifier = make_classifier(args)
+        pred, train_time, batch_time = fit_and_score(classifier, features, labels, train_idx, test_idx)
+
+        matrix, cols = confusion_matrix(labels[test_idx], pred, classes)
+        total += matrix
+        accuracy = float(np.mean(pred == labels[test_idx]))
+        fold_results.append({
+            "fold": f,
+            "train": len(train_idx),
+            "test": len(test_idx),
+            "accuracy": round(accuracy, 4),
+            "train_s": round(train_time, 4),
+            "batch_predict_per_sec": round(len(test_idx) / batch_time, 1) if batch_time else None,
+            "memory": classifier.footprint(),
+        })
+        print(f"Fold {f}: accuracy {accuracy:.4f} ({len(train_idx)} train / {len(test_idx)} test)")
+
+        if args.quantize:
+            # Same split through the float path, for the accuracy / memory delta
+            reference = make_classifier(args, quantize=False)
+            ref_pred, _, ref_time = fit_and_score(reference, features, labels, train_idx, test_idx)
+            baseline.append({
+                "accuracy": float(np.mean(ref_pred == labels[test_idx])),
+                "agreement": float(np.mean(ref_pred == pred)),
+                "batch_predict_per_sec": len(test_idx) / ref_time if ref_time else None,
+                "memory": reference.footprint(),
+            })
+
+        if f == 0 and args.latency_samples:
+            picks = test_idx[:args.latency_samples]
+            latency = measure_latency(classifier, [paths[i] for i in picks], args.repeats)
+
+    cols = [0] + classes
+    accuracies = [r["accuracy"] for r in fold_results]
+    quantization = quantization_report(fold_results, baseline) if baseline else None
+    return {
+        "config": {
+            "dataset": args.dataset,
+            "images": int(len(labels)),
+            "index": args.index,
+            "k": args.k,
+            "pipeline": make_pipeline(args).to_meta(),
+            "folds": args.folds,
+            "test_size": args.test_size if args.folds <= 1 else None,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "extract_s": round(extract_time, 3),
+        "accuracy_mean": round(float(np.mean(accuracies)), 4),
+        "accuracy_std": round(float(np.std(accuracies)), 4),
+        "folds": fold_results,
+        "per_class": class_report(total, cols, classes),
+        "confusion_matrix": {
+            "labels": ["unknown"] + [CLASS_NAMES.get(c, str(c)) for c in classes],
+            "rows": total.tolist(),
+        },
+        "latency": latency,
+        "quantization": quantization,
+    }
+
+
+def quantization_report(fold_results, baseline):
+    # Quantized run vs the float path on the same folds
+    def total(memory):
+        return memory["samples_bytes"] + memory["index_bytes"]
+
+    q_bytes = np.mean([total(r["memory"]) for r in fold_results])
+    f_bytes = np.mean([total(b["memory"]) for b in baseline])
+    q_acc = np.mean([r["accuracy"] for r in fold_results])
+    f_acc = np.mean([b["accuracy"] for b in baseline])
+    q_rate = np.mean([r["batch_predict_per_sec"] or 0 for r in fold_results])
+    f_rate = np.mean([b["batch_predict_per_sec"] or 0 for b in baseline])
+    return {
+        "dtype": fold_results[0]["memory"]["dtype"],
+        "accuracy_float": round(float(f_acc), 4),
+        "accuracy_quantized": round(float(q_acc), 4),
+        "accuracy_delta": round(float(q_acc - f_acc), 4),
+        "prediction_agreement": round(float(np.mean([b["agreement"] for b in baseline])), 4),
+        "memory_float_bytes": int(f_bytes),
+        "memory_quantized_bytes": int(q_bytes),
+        "memory_ratio": round(float(f_bytes / q_bytes), 2) if q_bytes else None,
+        "batch_predict_per_sec_float": round(float(f_rate), 1),
+        "batch_predict_per_sec_quantized": round(float(q_rate), 1),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate HandClassifier accuracy and latency")
+    parser.add_argument("--dataset", default=train_model.DATASET_PATH, help="directory with rock/paper/scissors folders")
+    parser.add_argument("--folds", type=int, default=1, help="k-fold cross-validation (1 = single train/test split)")
+    parser.add_argument("--test-size", type=float, default=0.2, help="test fraction for the single split")
+    parser.add_argument("--index", default="brute", help="nearest-neighbour backend: brute, pca or ivf")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--img-size", type=int, default=32)
+    parser.add_argument("--normalize", action="store_true", help="histogram-equalize before extraction")
+    parser.add_argument("--hog", action="store_true", help="use HOG features instead of raw pixels")
+    parser.add_argument("--pca", type=int, default=0, help="PCA components (0 = off)")
+    parser.add_argument("--quantize", action="store_true",
+                        help="store 1-byte feature codes; also reports the delta against the float path")
+    parser.add_argument("--limit", type=int, default=0, help="evaluate on a random subset of N images")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--latency-samples", type=int, default=200, help="test images timed one by one")
+    parser.add_argument("--repeats", type=int, default=3, help="passes over the latency samples")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmark(args)
+    print(json.dumps({k: results[k] for k in ("accuracy_mean", "per_class", "latency", "quantization")}, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
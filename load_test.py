@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+import Hand_Classifier
+import Inference_Server
+import Opponent_Engine
+import Perf_Profiler
+import Session_Manager
+
+# Load test for the multi-session game backend.
+#
+# In process (SessionManager, no sockets): opens --sessions games, measures
+# memory per session, then plays --rounds rounds in every session in batches
+# of --batch and reports rounds/sec and batch latency:
+#   python load_test.py --sessions 10000 --rounds 50 --batch 256
+#   python load_test.py --model model.rpsm    (moves classified by the shared model)
+#
+# Against a running Inference_Server.py: --clients WebSocket pages each play
+# --rounds rounds back to back:
+#   python load_test.py --server localhost:8765 --clients 200 --rounds 50
+
+
+def measure_sessions(n, strategy, options):
+    # Build a manager with n open sessions; bytes per session from tracemalloc
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    manager = Session_Manager.SessionManager(strategy, **options)
+    for i in range(n):
+        manager.open(f"s{i}")
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return manager, (after - before) / n
+
+
+def run_local(args):
+    classifier = None
+    if args.model:
+        # One read-only model shared by every session
+        classifier = Hand_Classifier.HandClassifier(args.model)
+        if not classifier.is_trained:
+            raise SystemExit(f"No trained model at {args.model}")
+
+    t0 = time.perf_counter()
+    manager, measured = measure_sessions(args.sessions, args.strategy, {"seed": args.seed})
+    open_s = time.perf_counter() - t0
+
+    rng = np.random.default_rng(args.seed)
+    sids = np.array(list(manager.sessions))
+    batch_ms = Perf_Profiler.RollingHistogram(window=1000)
+    t0 = time.perf_counter()
+    for _ in range(args.rounds):
+        order = rng.permutation(len(sids))
+        for start in range(0, len(order), args.batch):
+            batch = order[start:start + args.batch]
+            t1 = time.perf_counter()
+            if classifier is not None:
+                # Classify stored samples as stand-ins for camera frames
+                picks = rng.integers(0, len(classifier.train_labels), len(batch))
+                moves = classifier.predict_features(classifier.train_features[picks]).tolist()
+            else:
+                moves = rng.integers(1, 4, len(batch)).tolist()
+            manager.play_many(sids[batch].tolist(), moves)
+            batch_ms.add((time.perf_counter() - t1) * 1000)
+    elapsed = time.perf_counter() - t0
+    stats = manager.stats()
+
+    t1 = time.perf_counter()
+    evicted = manager.evict_idle(now=manager.clock() + manager.idle_timeout + 1)
+    evict_s = time.perf_counter() - t1
+
+    rounds = args.sessions * args.rounds
+    return {
+        "mode": "local",
+        "sessions": args.sessions,
+        "rounds": rounds,
+        "seconds": round(elapsed, 3),
+        "rounds_per_sec": round(rounds / elapsed),
+        "batch": batch_ms.summary(all_time=True),
+        "open_sessions_sec": round(open_s, 3),
+        "bytes_per_session": round(measured),
+        "manager": stats,
+        "evicted": evicted,
+        "evict_ms": round(evict_s * 1000, 3),
+    }
+
+
+async def ws_connect(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((f"GET /ws HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    if b" 101 " not in head.split(b"\r\n", 1)[0]:
+        raise ConnectionError(f"WebSocket upgrade refused: {head[:80]!r}")
+    return reader, writer
+
+
+async def play_client(host, port, rounds, latency, rng):
+    reader, writer = await ws_connect(host, port)
+    moves = ("rock", "paper", "scissors")
+    try:
+        for i in range(rounds):
+            message = json.dumps({"type": "round", "id": i, "move": moves[rng.integers(3)]}).encode()
+            t0 = time.perf_counter()
+            writer.write(Inference_Server.InferenceServer.ws_frame(0x1, message, os.urandom(4)))
+            await writer.drain()
+            _, _, payload = await Inference_Server.InferenceServer.ws_read_frame(reader)
+            latency.add((time.perf_counter() - t0) * 1000)
+            if "error" in json.loads(payload):
+                raise RuntimeError(payload)
+        writer.write(Inference_Server.InferenceServer.ws_frame(0x8, b"", os.urandom(4)))
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /api/stats HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def run_server(args):
+    host, _, port = args.server.partition(":")
+    port = int(port or 8765)
+    latency = Perf_Profiler.RollingHistogram(window=10000)
+    rng = np.random.default_rng(args.seed)
+    t0 = time.perf_counter()
+    await asyncio.gather(*[play_client(host, port, args.rounds, latency, rng) for _ in range(args.clients)])
+    elapsed = time.perf_counter() - t0
+    rounds = args.clients * args.rounds
+    return {
+        "mode": "server",
+        "clients": args.clients,
+        "rounds": rounds,
+        "seconds": round(elapsed, 3),
+        "rounds_per_sec": round(rounds / elapsed),
+        "latency": latency.summary(all_time=True),
+        "server": await fetch_stats(host, port),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the multi-session game backend")
+    parser.add_argument("--sessions", type=int, default=10000, help="in-process sessions")
+    parser.add_argument("--rounds", type=int, default=50, help="rounds per session / client")
+    parser.add_argument("--batch", type=int, default=256, help="sessions played per play_many call")
+    parser.add_argument("--strategy", default="mixture", choices=sorted(Opponent_Engine.STRATEGIES))
+    parser.add_argument("--model", help="classify moves with this model (shared by all sessions)")
+    parser.add_argument("--server", help="host:port of a running Inference_Server.py")
+    parser.add_argument("--clients", type=int, default=100, help="concurrent WebSocket clients (--server)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(run_server(args)) if args.server else run_local(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
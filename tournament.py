@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import Opponent_Engine
+
+# Offline difficulty tuning: every computer strategy plays every scripted
+# player model; games are split into chunks and simulated across a process
+# pool (each chunk is one vectorized Opponent_Engine.simulate call).
+#
+#   python tournament.py --rounds 1000 --games 4000
+#   python tournament.py --strategy mixture:decay=0.8 --strategy markov:order=2 --player sticky
+
+
+def parse_value(text):
+    # "2" -> 2, "0.9" -> 0.9, "0/1/2" -> (0, 1, 2)
+    if "/" in text:
+        return tuple(parse_value(part) for part in text.split("/"))
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_strategy(spec):
+    # "markov:order=2,decay=0.9" -> ("markov", {"order": 2, "decay": 0.9})
+    name, _, opts = spec.partition(":")
+    if name not in Opponent_Engine.STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}', choose from {sorted(Opponent_Engine.STRATEGIES)}")
+    options = {}
+    for item in filter(None, opts.split(",")):
+        key, _, value = item.partition("=")
+        options[key.strip()] = parse_value(value.strip())
+    return name, options
+
+
+def _play_chunk(job):
+    # Runs in a worker process
+    key, name, options, player, rounds, games, seed = job
+    return key, player, Opponent_Engine.simulate(name, player, rounds, games, seed, **options)
+
+
+def make_jobs(specs, players, rounds, games, chunk_games, seed):
+    jobs = []
+    for spec in specs:
+        name, options = parse_strategy(spec)
+        for player in players:
+            for start in range(0, games, chunk_games):
+                chunk_seed = seed * 1000003 + len(jobs)
+                jobs.append((spec, name, options, player, rounds, min(chunk_games, games - start), chunk_seed))
+    return jobs
+
+
+def run_tournament(specs, players, rounds=1000, games=1000, chunk_games=250, workers=None, seed=0):
+    jobs = make_jobs(specs, players, rounds, games, chunk_games, seed)
+    totals = {(spec, player): np.zeros(3, dtype=np.int64) for spec in specs for player in players}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    t0 = time.perf_counter()
+    pool = Pool(min(workers, len(jobs))) if workers > 1 and len(jobs) > 1 else None
+    try:
+        results = pool.imap_unordered(_play_chunk, jobs) if pool else map(_play_chunk, jobs)
+        for spec, player, counts in results:
+            totals[(spec, player)] += counts
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - t0
+
+    results = []
+    for (spec, player), (computer_wins, player_wins, draws) in totals.items():
+        n = int(computer_wins + player_wins + draws)
+        results.append({
+            "strategy": spec,
+            "player": player,
+            "rounds": n,
+            "win_rate": round(computer_wins / n, 4),
+            "loss_rate": round(player_wins / n, 4),
+            "draw_rate": round(draws / n, 4),
+            "edge": round((computer_wins - player_wins) / n, 4),
+        })
+    total_rounds = sum(r["rounds"] for r in results)
+    return {
+        "results": results,
+        "total_rounds": total_rounds,
+        "seconds": round(elapsed, 3),
+        "rounds_per_sec": round(total_rounds / elapsed) if elapsed else None,
+    }
+
+
+def print_report(report):
+    # Computer's win / loss / draw rate per pairing, then each strategy's average edge
+    width = max(len(r["strategy"]) for r in report["results"]) + 2
+    print(f"{'strategy':<{width}}{'player':<21}{'win':>7}{'loss':>7}{'draw':>7}{'edge':>8}")
+    edges = {}
+    for r in report["results"]:
+        edges.setdefault(r["strategy"], []).append(r["edge"])
+        print(f"{r['strategy']:<{width}}{r['player']:<21}{r['win_rate']:7.3f}{r['loss_rate']:7.3f}"
+              f"{r['draw_rate']:7.3f}{r['edge']:+8.3f}")
+    print()
+    for spec, values in sorted(edges.items(), key=lambda x: -np.mean(x[1])):
+        print(f"{spec:<{width}}mean edge {np.mean(values):+.3f}")
+    print(f"\n{report['total_rounds']:,} rounds in {report['seconds']}s ({report['rounds_per_sec']:,} rounds/s)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate computer strategies against scripted player models")
+    parser.add_argument("--strategy", action="append",
+                        help="strategy, optionally with options: markov:order=2,decay=0.9 (repeatable; default all)")
+    parser.add_argument("--player", action="append", choices=sorted(Opponent_Engine.PLAYERS),
+                        help="player model (repeatable; default all)")
+    parser.add_argument("--rounds", type=int, default=1000, help="rounds per game")
+    parser.add_argument("--games", type=int, default=1000, help="games per strategy/player pairing")
+    parser.add_argument("--chunk-games", type=int, default=250, help="games per worker task")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_tournament(
+        args.strategy or list(Opponent_Engine.STRATEGIES),
+        args.player or list(Opponent_Engine.PLAYERS),
+        args.rounds, args.games, args.chunk_games, args.workers, args.seed,
+    )
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
@@ -1,13 +1,23 @@
-import cv2
+import argparse
 import os
-import numpy as np
+import time
+
+import Dataset_Stream
+import Feature_Pipeline
 import Hand_Classifier
 
-# Path to the dataset
-DATASET_PATH = r"C:\Users\V.Tanush\.cache\kagglehub\datasets\drgfreeman\rockpaperscissors\versions\2"
+# Batch training from an image directory with rock/, paper/ and scissors/
+# sub-directories. Images are streamed through worker processes in chunks
+# (see Dataset_Stream), optionally with augmented copies:
+#   python train_model.py --dataset <dir> --augment 4 --output model.rpsm --workers 8
+#   python train_model.py --dataset <dir> --hog --pca 64    (HOG features reduced by PCA)
+# Samples are added to the model at --output if it already exists, using the
+# feature pipeline saved with it. The pipeline (including a fitted PCA) is
+# stored in the model, so Run.py plays with it as-is.
 
-# Initialize classifier
-classifier = Hand_Classifier.HandClassifier()
+# Path to the dataset (override with --dataset or the RPS_DATASET variable)
+DATASET_PATH = os.environ.get(
+    "RPS_DATASET", r"C:\Users\V.Tanush\.cache\kagglehub\datasets\drgfreeman\rockpaperscissors\versions\2")
 
 # Define class mapping
 CLASSES = {
@@ -16,42 +26,74 @@ CLASSES = {
     "scissors": 3
 }
 
-def train_from_dataset():
+def list_dataset(dataset_path=DATASET_PATH):
+    # (image_path, label) pairs from the rock/paper/scissors sub-directories
+    return list(Dataset_Stream.walk_dataset(dataset_path, CLASSES))
+
+def train_from_dataset(args):
     print("Starting training process...")
-    
-    total_images = 0
-    
-    for class_name, label in CLASSES.items():
-        class_dir = os.path.join(DATASET_PATH, class_name)
-        if not os.path.exists(class_dir):
-            print(f"Warning: Directory not found: {class_dir}")
-            continue
-            
-        print(f"Processing {class_name} images...")
-        images = os.listdir(class_dir)
-        
-        for img_name in images:
-            img_path = os.path.join(class_dir, img_name)
-            
-            # Read image
-            img = cv2.imread(img_path)
-            if img is None:
-                continue
-                
-            # Add to classifier
-            classifier.add_sample(img, label)
-            total_images += 1
-            
-            if total_images % 100 == 0:
-                print(f"Processed {total_images} images...")
-
-    print(f"Total images processed: {total_images}")
-    
+
+    # Initialize classifier (adds to the model at --output if there is one);
+    # --max-per-class keeps the model bounded however many samples stream in
+    pipeline = Feature_Pipeline.FeaturePipeline(
+        img_size=(args.img_size, args.img_size),
+        normalize=args.normalize,
+        hog=args.hog,
+        pca_components=args.pca or None,
+        quantize=args.quantize,
+    )
+    classifier = Hand_Classifier.HandClassifier(args.output, max_per_class=args.max_per_class,
+                                                pipeline=pipeline, quantize=args.quantize)
+    if classifier.pipeline is not pipeline:
+        # An existing model keeps the pipeline it was trained with
+        keys = ("img_size", "normalize", "hog", "pca_components")
+        saved = {k: classifier.pipeline.to_meta()[k] for k in keys}
+        wanted = {k: pipeline.to_meta()[k] for k in keys}
+        if saved != wanted:
+            print(f"Warning: {args.output} was trained with {saved}; adding to it with those settings")
+    augmenter = Dataset_Stream.Augmenter(flip=not args.no_flip, rotate=args.rotate, brightness=args.brightness,
+                                         crop=args.crop)
+
+    # Chunks are added as they arrive; only a few are ever held in memory
+    done = {"chunks": 0, "images": 0}
+    def progress(images, samples):
+        if done["chunks"] % 10 == 0:
+            print(f"Processed {images} images ({samples} samples)...")
+        done["chunks"] += 1
+        done["images"] = images
+
+    t0 = time.perf_counter()
+    samples = classifier.add_dataset(Dataset_Stream.walk_dataset(args.dataset, CLASSES), args.workers,
+                                     args.chunk_size, augmenter, args.augment, progress, args.seed)
+    elapsed = time.perf_counter() - t0
+    print(f"Total images processed: {done['images']}, samples: {samples} in {elapsed:.1f}s "
+          f"({samples / elapsed if elapsed else 0:.0f} samples/s)")
+
     # Train and save
     if classifier.train():
         print("Training complete!")
     else:
         print("Training failed.")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the hand classifier from an image directory")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="directory with rock/paper/scissors folders")
+    parser.add_argument("--augment", type=int, default=0, help="augmented copies per image (0 = none)")
+    parser.add_argument("--output", default="model.rpsm", help="model file to create or add to")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="images per worker task")
+    parser.add_argument("--max-per-class", type=int, default=None, help="keep at most n samples per gesture")
+    parser.add_argument("--rotate", type=float, default=15.0, help="max rotation in degrees")
+    parser.add_argument("--brightness", type=float, default=0.25, help="max brightness change (fraction)")
+    parser.add_argument("--crop", type=float, default=0.1, help="max fraction of each side cropped")
+    parser.add_argument("--no-flip", action="store_true", help="do not mirror images")
+    parser.add_argument("--img-size", type=int, default=32, help="square size images are resized to")
+    parser.add_argument("--hog", action="store_true", help="HOG features instead of raw pixels")
+    parser.add_argument("--normalize", action="store_true", help="per-image contrast normalization")
+    parser.add_argument("--pca", type=int, default=0, help="PCA components, fitted on the training set (0 = off)")
+    parser.add_argument("--quantize", action="store_true", help="store 1-byte feature codes (4x smaller model)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    train_from_dataset()
+    train_from_dataset(parse_args())